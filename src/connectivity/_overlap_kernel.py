@@ -0,0 +1,24 @@
+from typing import List, Sequence, Tuple
+
+def sweep_overlaps(lows: Sequence[int], highs: Sequence[int]) -> List[Tuple[int, int]]:
+    """Find overlapping CIDR ranges with a sort-and-sweep
+    
+    Ranges are given as parallel sequences of inclusive integer bounds.
+    CIDR blocks are either nested or disjoint, so the ranges still open at
+    any point form a chain that a single stack can track. Returns index
+    pairs (i, j) with i < j, sorted.
+    """
+    order = sorted(range(len(lows)), key=lambda k: (lows[k], -highs[k], k))
+    stack: List[int] = []
+    pairs: List[Tuple[int, int]] = []
+    
+    for k in order:
+        low = lows[k]
+        while stack and highs[stack[-1]] < low:
+            stack.pop()
+        for outer in stack:
+            pairs.append((outer, k) if outer < k else (k, outer))
+        stack.append(k)
+    
+    pairs.sort()
+    return pairs
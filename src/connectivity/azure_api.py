@@ -0,0 +1,415 @@
+"""
+Shared Azure plumbing for the connectivity analyzers: running az commands,
+ARM REST reads and Azure Resource Graph lookups.
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+import atexit
+import json
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # Optional: noticeably faster on large az list outputs
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Skip the telemetry upload each az process would otherwise start on exit
+_AZ_ENV_OVERRIDES = {'AZURE_CORE_COLLECT_TELEMETRY': 'no'}
+
+# az resolved against PATH once (az.cmd on Windows) rather than on every subprocess
+AZ = shutil.which('az') or 'az'
+
+# Long-lived Python worker that runs az commands in-process through azure-cli,
+# one JSON-encoded argument list per stdin line and one reply per stdout line
+_AZ_WORKER_SCRIPT = """
+import io, json, sys
+from azure.cli.core import get_default_cli
+reply, sys.stdout = sys.stdout, sys.stderr
+reply.write('ready\\n')
+reply.flush()
+for line in sys.stdin:
+    out, sys.stderr = io.StringIO(), io.StringIO()
+    try:
+        code = get_default_cli().invoke(json.loads(line), out_file=out)
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        code = 1
+        sys.stderr.write(str(e))
+    err, sys.stderr = sys.stderr.getvalue(), sys.__stderr__
+    reply.write(json.dumps({'code': code, 'out': out.getvalue(), 'err': err}) + '\\n')
+    reply.flush()
+"""
+
+# At most this many az workers, matching the analyzers' thread pool; callers
+# beyond the cap run az as a separate process instead of waiting for one
+_MAX_AZ_WORKERS = 8
+
+# Idle az workers; _workers_available turns False if azure-cli cannot be imported
+_idle_workers: 'queue.SimpleQueue[subprocess.Popen]' = queue.SimpleQueue()
+_workers_available = True
+
+# Every live worker (idle or busy) plus slots reserved by workers still starting
+_live_workers: Set[subprocess.Popen] = set()
+_worker_slots = 0
+_WORKERS_LOCK = threading.Lock()
+
+def _start_az_worker() -> Optional[subprocess.Popen]:
+    """Start an az worker, or return None if azure-cli is not importable"""
+    try:
+        proc = subprocess.Popen([sys.executable, '-c', _AZ_WORKER_SCRIPT],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, text=True,
+                                env={**os.environ, **_AZ_ENV_OVERRIDES})
+    except OSError:
+        return None
+    if proc.stdout.readline().strip() != 'ready':
+        proc.kill()
+        proc.wait()
+        return None
+    return proc
+
+def _acquire_az_worker(fresh: bool = False) -> Tuple[Optional[subprocess.Popen], bool]:
+    """Take an idle worker (unless fresh) or start one, as (worker, came from the pool)
+    
+    The worker is None when workers are unavailable or the cap is reached.
+    """
+    global _workers_available, _worker_slots
+    if not fresh:
+        try:
+            return _idle_workers.get_nowait(), True
+        except queue.Empty:
+            pass
+    with _WORKERS_LOCK:
+        if not _workers_available or _worker_slots >= _MAX_AZ_WORKERS:
+            return None, False
+        _worker_slots += 1
+    
+    proc = _start_az_worker()
+    with _WORKERS_LOCK:
+        if proc is None:
+            _worker_slots -= 1
+            _workers_available = False
+        else:
+            _live_workers.add(proc)
+    return proc, False
+
+def _discard_az_worker(proc: subprocess.Popen):
+    """Kill a worker and free its slot"""
+    global _worker_slots
+    proc.kill()
+    proc.wait()
+    with _WORKERS_LOCK:
+        if proc in _live_workers:
+            _live_workers.discard(proc)
+            _worker_slots -= 1
+
+def _run_in_az_worker(args: List[str], timeout: int) -> Optional[Tuple[int, str, str]]:
+    """Run az args in a persistent worker as (exit code, stdout, stderr), or None if no worker is free
+    
+    Raises subprocess.TimeoutExpired if the command runs past timeout.
+    """
+    fresh = False
+    while True:
+        proc, pooled = _acquire_az_worker(fresh)
+        if proc is None:
+            return None
+        
+        # A worker that hangs is killed and never returned to the pool
+        timed_out = threading.Event()
+        def expire(proc=proc, timed_out=timed_out):
+            timed_out.set()
+            proc.kill()
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+        try:
+            proc.stdin.write(json.dumps(args) + '\n')
+            proc.stdin.flush()
+            reply = json.loads(proc.stdout.readline())
+        except (OSError, ValueError):
+            reply = None
+        finally:
+            # Wait out a kill already in progress so the checks below see it
+            timer.cancel()
+            timer.join()
+        
+        if reply is not None and not timed_out.is_set() and proc.poll() is None:
+            _idle_workers.put(proc)
+        else:
+            _discard_az_worker(proc)
+        
+        if reply is not None:
+            return reply['code'], reply['out'], reply['err']
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(['az', *args], timeout)
+        if not pooled:
+            return 1, '', 'az worker exited unexpectedly'
+        # The pooled worker had died while idle; try once more on a new one
+        fresh = True
+
+@atexit.register
+def _shutdown_az_workers():
+    """Stop all az workers when the process exits"""
+    with _WORKERS_LOCK:
+        workers = list(_live_workers)
+    for proc in workers:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+
+def _kill_process_group(proc: subprocess.Popen):
+    """Kill a process started in its own session along with its children
+    
+    az is usually a shell wrapper around Python, so killing only the wrapper
+    would leave the child holding stdout open until it finishes.
+    """
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except OSError:
+        pass
+
+def run_az(cmd: List[str], timeout: int = 30) -> Tuple[int, Any, str]:
+    """Run an az CLI command as (exit code, stdout, stderr)
+    
+    Raises subprocess.TimeoutExpired if the command runs past timeout.
+    
+    az commands go to a persistent worker when azure-cli is importable, which
+    skips interpreter startup and CLI imports on every call. Otherwise az runs
+    as its own process with no stdin, so a prompt (such as offering to install
+    a missing extension) fails at once instead of waiting for the timeout. Its
+    stdout is returned as bytes, so large list results are parsed without a
+    text decode; a timer kills the process group on timeout.
+    """
+    if cmd[0] in ('az', AZ):
+        reply = _run_in_az_worker(cmd[1:], timeout)
+        if reply is not None:
+            return reply
+        cmd = [AZ, *cmd[1:]]
+    
+    started = time.monotonic()
+    try:
+        with subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              env={**os.environ, **_AZ_ENV_OVERRIDES},
+                              start_new_session=hasattr(os, 'killpg')) as proc:
+            # Killing the process closes its pipes, which ends the read below
+            timer = threading.Timer(timeout, _kill_process_group, (proc,))
+            timer.start()
+            try:
+                output, errors = proc.communicate()
+            finally:
+                timer.cancel()
+    except OSError as e:
+        return 127, b'', str(e)
+    
+    if time.monotonic() - started >= timeout:
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return proc.returncode, output, errors.decode(errors='replace')
+
+def run_az_json(cmd: List[str], timeout: int = 30):
+    """Run an az CLI command and parse its JSON output, or return None on failure
+    
+    Raises subprocess.TimeoutExpired if the command runs past timeout.
+    """
+    returncode, output, _ = run_az(cmd, timeout)
+    if returncode != 0:
+        return None
+    try:
+        return json_loads(output)
+    except ValueError:
+        return None
+
+# Seconds a successful az lookup is reused across analyzers in this process
+_CLI_CACHE_TTL = 300.0
+
+# Full az command -> (monotonic fetch time, parsed JSON output)
+_CLI_CACHE: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
+_CLI_CACHE_LOCK = threading.Lock()
+
+def cached_az_json(cmd: List[str], timeout: int = 30, ttl: float = _CLI_CACHE_TTL) -> Any:
+    """Run an az command and parse its JSON output, reusing a result younger than ttl
+    
+    Raises RuntimeError with the CLI's stderr when the command fails; failures are not cached.
+    """
+    key = tuple(cmd)
+    with _CLI_CACHE_LOCK:
+        cached = _CLI_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    
+    returncode, output, errors = run_az(cmd, timeout)
+    if returncode != 0:
+        raise RuntimeError(errors.strip())
+    data = json_loads(output) if output.strip() else None
+    with _CLI_CACHE_LOCK:
+        _CLI_CACHE[key] = (time.monotonic(), data)
+    return data
+
+def with_subscription(cmd: List[str], subscription_id: Optional[str]) -> List[str]:
+    """Append --subscription to an az command when one is given"""
+    if subscription_id:
+        cmd.extend(['--subscription', subscription_id])
+    return cmd
+
+_ARM_ENDPOINT = 'https://management.azure.com'
+
+# Refresh cached ARM tokens this many seconds before they expire
+_TOKEN_REFRESH_MARGIN = 300
+
+# Keep-alive session shared by all ARM REST calls, created on first use so
+# importing this module (as every analyzer does) stays cheap
+_session: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+# subscription_id (None = CLI default) -> (expires_at, access_token, subscription)
+_token_cache: Dict[Optional[str], Tuple[float, str, str]] = {}
+_TOKEN_LOCK = threading.Lock()
+
+# After a failed token fetch, go straight to the CLI fallback for this long
+_TOKEN_RETRY_DELAY = 300
+
+# subscription_id -> time before which no new token fetch is attempted
+_token_retry_at: Dict[Optional[str], float] = {}
+
+def _token_expiry(token_info: Dict) -> float:
+    """Expiry of an az account get-access-token result as a POSIX timestamp"""
+    if token_info.get('expires_on'):
+        return float(token_info['expires_on'])
+    try:
+        return datetime.strptime(token_info['expiresOn'], '%Y-%m-%d %H:%M:%S.%f').timestamp()
+    except (KeyError, TypeError, ValueError):
+        # Unknown expiry: reuse the token for a few minutes only
+        return time.time() + 2 * _TOKEN_REFRESH_MARGIN
+
+def _arm_token(subscription_id: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Cached ARM bearer token and subscription id, fetched once through the az CLI
+    
+    One token serves every analyzer, and failures are remembered too, so a
+    missing login costs one token fetch per retry window rather than one per call.
+    """
+    with _TOKEN_LOCK:
+        now = time.time()
+        cached = _token_cache.get(subscription_id)
+        if cached is not None and cached[0] - _TOKEN_REFRESH_MARGIN > now:
+            return cached[1], cached[2]
+        if _token_retry_at.get(subscription_id, 0) > now:
+            return None
+        
+        try:
+            token_info = run_az_json(with_subscription(
+                ['az', 'account', 'get-access-token',
+                 '--resource', _ARM_ENDPOINT + '/',
+                 '--output', 'json'], subscription_id))
+        except subprocess.TimeoutExpired:
+            token_info = None
+        
+        subscription = subscription_id or (token_info or {}).get('subscription')
+        if not token_info or not token_info.get('accessToken') or not subscription:
+            _token_retry_at[subscription_id] = now + _TOKEN_RETRY_DELAY
+            return None
+        
+        # The default subscription's token also serves explicit requests for it
+        entry = (_token_expiry(token_info), token_info['accessToken'], subscription)
+        _token_cache[subscription_id] = entry
+        _token_cache[subscription] = entry
+        return token_info['accessToken'], subscription
+
+def _arm_session() -> requests.Session:
+    """The shared ARM session
+    
+    ARM throttling (429) and transient 5xx responses are retried with backoff,
+    honouring Retry-After.
+    """
+    global _session
+    with _SESSION_LOCK:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET'}),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=retry))
+            _session = session
+        return _session
+
+def arm_get(path: str, subscription_id: Optional[str], api_version: str) -> Optional[Dict]:
+    """GET a subscription-relative ARM path, or return None on failure"""
+    auth = _arm_token(subscription_id)
+    if auth is None:
+        return None
+    token, subscription = auth
+    
+    try:
+        response = _arm_session().get(
+            f"{_ARM_ENDPOINT}/subscriptions/{subscription}/{path}",
+            params={'api-version': api_version},
+            headers={'Authorization': f"Bearer {token}"},
+            timeout=30
+        )
+        if response.status_code == 200:
+            return json_loads(response.content)
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+def flatten_properties(resource: Dict, nested: Tuple[str, ...] = ()) -> Dict:
+    """Lift ARM 'properties' to the top level, matching the az CLI output shape
+    
+    Entries of the sub-resource lists named in nested are flattened the same way.
+    """
+    flat = dict(resource.get('properties') or {})
+    flat.update((key, value) for key, value in resource.items() if key != 'properties')
+    for key in nested:
+        if flat.get(key):
+            flat[key] = [flatten_properties(item) for item in flat[key]]
+    return flat
+
+# Resource ids per az graph query, well under its 1000-row page limit
+_GRAPH_BATCH_SIZE = 500
+
+def graph_rows(resource_ids: List[str], subscription_id: Optional[str] = None) -> Dict[str, Dict]:
+    """Azure Resource Graph rows for resource_ids, keyed by lower-cased id
+    
+    Needs the resource-graph az extension; without it every id is simply missing.
+    """
+    rows = {}
+    for start in range(0, len(resource_ids), _GRAPH_BATCH_SIZE):
+        batch = resource_ids[start:start + _GRAPH_BATCH_SIZE]
+        id_list = ', '.join("'" + rid.replace("'", "\\'") + "'" for rid in batch)
+        cmd = ['az', 'graph', 'query',
+               '--graph-query', f"Resources | where id in~ ({id_list})",
+               '--first', str(len(batch)),
+               '--output', 'json']
+        if subscription_id:
+            cmd.extend(['--subscriptions', subscription_id])
+        try:
+            result = run_az_json(cmd)
+        except subprocess.TimeoutExpired:
+            continue
+        if result is None:
+            continue
+        
+        # Older resource-graph extensions return the rows as a bare list
+        for row in result.get('data', []) if isinstance(result, dict) else result:
+            rows[row.get('id', '').lower()] = row
+    return rows
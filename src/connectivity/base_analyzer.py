@@ -2,8 +2,11 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
+import copy
 import logging
 
+from .azure_api import AZ, cached_az_json
+
 @dataclass
 class AnalysisResult:
     """Base class for analysis results"""
@@ -24,6 +27,25 @@ class BaseAnalyzer(ABC):
         self.hub_type = hub_type
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    def _get_workspace_info(self) -> Dict:
+        """Get workspace information; the az lookup is shared by all analyzers, each gets its own copy"""
+        cmd = [AZ, 'ml', 'workspace', 'show',
+               '--name', self.workspace_name,
+               '--resource-group', self.resource_group,
+               '--output', 'json']
+        
+        if self.subscription_id:
+            cmd.extend(['--subscription', self.subscription_id])
+            
+        try:
+            workspace_info = cached_az_json(cmd, timeout=60)
+        except RuntimeError as e:
+            raise RuntimeError(f"Failed to get workspace info: {str(e)}")
+        if not workspace_info:
+            raise RuntimeError("Failed to get workspace info: empty response")
+        
+        return copy.deepcopy(workspace_info)
+    
     @abstractmethod
     def analyze(self) -> AnalysisResult:
         """Perform the analysis"""
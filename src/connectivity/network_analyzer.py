@@ -1,8 +1,7 @@
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
 from .base_analyzer import BaseAnalyzer, AnalysisResult
-import json
-import subprocess
+from .azure_api import run_az_json
 
 @dataclass
 class NetworkConfiguration:
@@ -60,22 +59,6 @@ class NetworkAnalyzer(BaseAnalyzer):
                 error=str(e)
             )
     
-    def _get_workspace_info(self) -> Dict:
-        """Get detailed workspace information"""
-        cmd = ['az', 'ml', 'workspace', 'show',
-               '--name', self.workspace_name,
-               '--resource-group', self.resource_group,
-               '--output', 'json']
-        
-        if self.subscription_id:
-            cmd.extend(['--subscription', self.subscription_id])
-            
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode != 0:
-            raise RuntimeError(f"Failed to get workspace info: {result.stderr}")
-            
-        return json.loads(result.stdout)
-    
     def _analyze_network_type(self, workspace_info: Dict):
         """Determine network configuration type"""
         # Check for managed network
@@ -138,9 +121,8 @@ class NetworkAnalyzer(BaseAnalyzer):
             if self.subscription_id:
                 cmd.extend(['--subscription', self.subscription_id])
                 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                all_endpoints = json.loads(result.stdout)
+            all_endpoints = run_az_json(cmd, timeout=60)
+            if all_endpoints is not None:
                 
                 # Build workspace resource ID pattern for filtering
                 workspace_pattern = f"/workspaces/{self.workspace_name}"
@@ -180,9 +162,8 @@ class NetworkAnalyzer(BaseAnalyzer):
             if self.subscription_id:
                 cmd.extend(['--subscription', self.subscription_id])
                 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                rules = json.loads(result.stdout)
+            rules = run_az_json(cmd, timeout=60)
+            if rules is not None:
                 
                 for rule in rules:
                     rule_info = {
@@ -1,6 +1,17 @@
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import ipaddress
 import re
+import socket
+import sys
+from ._overlap_kernel import sweep_overlaps
+
+# Dotted-quad IPv4 address with optional prefix length, no leading zeros
+_IPV4_CIDR_RE = re.compile(
+    r'((?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d))'
+    r'(?:/(3[0-2]|[12]?\d))?',
+    re.ASCII
+)
+_IPV4_BASE = 4 << 128
 
 class NetworkUtils:
     """Utility functions for network analysis"""
@@ -30,33 +41,69 @@ class NetworkUtils:
             return "invalid"
     
     @staticmethod
-    def analyze_cidr_overlap(cidrs: List[str]) -> List[Dict]:
-        """Analyze CIDR blocks for overlaps"""
-        overlaps = []
-        networks = []
+    def _parse_cidrs_fast(cidrs: Iterable[str]) -> List[Tuple[str, int, int]]:
+        """Parse CIDR strings into (canonical CIDR, low, high) tuples
+        
+        Plain dotted-quad IPv4 CIDRs are converted with socket.inet_aton and
+        bit shifts; anything else (IPv6, netmask notation, ...) goes through
+        ipaddress. Canonical CIDRs are interned. Bounds are inclusive
+        integers with the IP version folded into the high bits so IPv4 and
+        IPv6 ranges never overlap. Invalid CIDRs are skipped.
+        """
+        parsed = []
         
-        # Convert to network objects
         for cidr in cidrs:
+            match = _IPV4_CIDR_RE.fullmatch(cidr)
+            if match:
+                address, prefix = match.group(1), match.group(2)
+                prefix_length = int(prefix) if prefix is not None else 32
+                host_bits = 32 - prefix_length
+                low = (int.from_bytes(socket.inet_aton(address), 'big') >> host_bits) << host_bits
+                high = low | ((1 << host_bits) - 1)
+                network = socket.inet_ntoa(low.to_bytes(4, 'big'))
+                parsed.append((
+                    sys.intern(f"{network}/{prefix_length}"),
+                    _IPV4_BASE | low,
+                    _IPV4_BASE | high
+                ))
+                continue
+            
             try:
-                networks.append(ipaddress.ip_network(cidr, strict=False))
+                network = ipaddress.ip_network(cidr, strict=False)
             except ValueError:
                 continue
+            version_base = network.version << 128
+            parsed.append((
+                sys.intern(str(network)),
+                version_base | int(network.network_address),
+                version_base | int(network.broadcast_address)
+            ))
+        
+        return parsed
+    
+    @staticmethod
+    def analyze_cidr_overlap(cidrs: List[str]) -> List[Dict]:
+        """Analyze CIDR blocks for overlaps"""
+        overlaps = []
+        
+        # Convert to canonical strings and integer bounds
+        parsed = NetworkUtils._parse_cidrs_fast(cidrs)
+        networks = [network for network, _, _ in parsed]
+        lows = [low for _, low, _ in parsed]
+        highs = [high for _, _, high in parsed]
                 
         # Check for overlaps
-        for i in range(len(networks)):
-            for j in range(i + 1, len(networks)):
-                if networks[i].overlaps(networks[j]):
-                    overlap_type = "overlap"
-                    if networks[i].subnet_of(networks[j]):
-                        overlap_type = f"{networks[i]} is subnet of {networks[j]}"
-                    elif networks[j].subnet_of(networks[i]):
-                        overlap_type = f"{networks[j]} is subnet of {networks[i]}"
-                    
-                    overlaps.append({
-                        'network1': str(networks[i]),
-                        'network2': str(networks[j]),
-                        'type': overlap_type
-                    })
+        for i, j in sweep_overlaps(lows, highs):
+            if lows[j] <= lows[i] and highs[i] <= highs[j]:
+                overlap_type = f"{networks[i]} is subnet of {networks[j]}"
+            else:
+                overlap_type = f"{networks[j]} is subnet of {networks[i]}"
+            
+            overlaps.append({
+                'network1': networks[i],
+                'network2': networks[j],
+                'type': overlap_type
+            })
                     
         return overlaps
     
@@ -66,7 +113,7 @@ class NetworkUtils:
         try:
             network = ipaddress.ip_network(cidr, strict=False)
             return {
-                'network': str(network),
+                'network': sys.intern(str(network)),
                 'network_address': str(network.network_address),
                 'broadcast_address': str(network.broadcast_address),
                 'netmask': str(network.netmask),
@@ -172,37 +219,35 @@ class NetworkUtils:
     @staticmethod
     def parse_port_range(port_range: str) -> List[int]:
         """Parse a port range string into a list of ports"""
-        ports = []
-        
         if port_range == '*' or port_range.lower() == 'any':
             return list(range(1, 65536))  # All ports
         
-        try:
-            # Handle single port
-            if '-' not in port_range:
-                ports.append(int(port_range))
-            else:
-                # Handle port range
-                start, end = port_range.split('-', 1)
-                start_port = int(start.strip())
-                end_port = int(end.strip())
-                ports.extend(range(start_port, end_port + 1))
-        except ValueError:
-            # Handle comma-separated ports
-            if ',' in port_range:
-                for port_str in port_range.split(','):
-                    try:
-                        if '-' in port_str:
-                            start, end = port_str.strip().split('-', 1)
-                            start_port = int(start.strip())
-                            end_port = int(end.strip())
-                            ports.extend(range(start_port, end_port + 1))
-                        else:
-                            ports.append(int(port_str.strip()))
-                    except ValueError:
-                        continue
+        # Dispatch on the string shape instead of trying int() first
+        if ',' in port_range:
+            ports = set()
+            for port_str in port_range.split(','):
+                ports.update(NetworkUtils._parse_port_token(port_str))
+        else:
+            ports = set(NetworkUtils._parse_port_token(port_range))
+        
+        return sorted(ports)
+    
+    @staticmethod
+    def _parse_port_token(token: str) -> Iterable[int]:
+        """Parse a single port or port range, yielding nothing if malformed"""
+        token = token.strip()
+        
+        if '-' in token:
+            start, _, end = token.partition('-')
+            start = start.strip()
+            end = end.strip()
+            if start.isdecimal() and end.isdecimal():
+                return range(int(start), int(end) + 1)
+            return ()
         
-        return sorted(list(set(ports)))
+        if token.isdecimal():
+            return (int(token),)
+        return ()
     
     @staticmethod
     def analyze_port_exposure(port_ranges: List[str]) -> Dict:
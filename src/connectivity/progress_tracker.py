@@ -1,16 +1,21 @@
 import sys
-from typing import Optional, Dict, Any, List
+from collections import deque
+from typing import Optional, Dict, Any, Deque
 from datetime import datetime
 
 class ProgressTracker:
     """Track and display progress of connectivity analysis"""
     
-    def __init__(self, total_steps: int, verbose: bool = False):
+    def __init__(self, total_steps: int, verbose: bool = False,
+                 max_step_details: Optional[int] = None):
         self.total_steps = total_steps
         self.current_step = 0
         self.verbose = verbose
         self.start_time = datetime.now()
-        self.step_details: List[Dict[str, Any]] = []
+        # Only the most recent max_step_details steps are kept (all if None)
+        self.step_details: Deque[Dict[str, Any]] = deque(maxlen=max_step_details)
+        self._success_count = 0
+        self._failed_count = 0
         
     def start_step(self, step_name: str, description: str = ""):
         """Start a new analysis step"""
@@ -29,11 +34,24 @@ class ProgressTracker:
         """Mark current step as complete"""
         if self.step_details:
             current = self.step_details[-1]
+            
+            # Keep running counters in step with re-completed steps
+            previous_status = current['status']
+            if previous_status == 'success':
+                self._success_count -= 1
+            elif previous_status == 'failed':
+                self._failed_count -= 1
+            
             current['end_time'] = datetime.now()
             current['duration'] = (current['end_time'] - current['start_time']).total_seconds()
             current['status'] = 'success' if success else 'failed'
             current['message'] = message
             
+            if success:
+                self._success_count += 1
+            else:
+                self._failed_count += 1
+            
     def _display_progress(self, step_name: str, description: str):
         """Display progress to user"""
         progress = f"[{self.current_step}/{self.total_steps}]"
@@ -45,14 +63,12 @@ class ProgressTracker:
     def get_summary(self) -> Dict[str, Any]:
         """Get summary of all steps"""
         total_duration = (datetime.now() - self.start_time).total_seconds()
-        successful_steps = sum(1 for s in self.step_details if s.get('status') == 'success')
-        failed_steps = sum(1 for s in self.step_details if s.get('status') == 'failed')
         
         return {
             'total_duration': total_duration,
             'total_steps': self.total_steps,
-            'completed_steps': len(self.step_details),
-            'successful_steps': successful_steps,
-            'failed_steps': failed_steps,
-            'step_details': self.step_details
+            'completed_steps': self.current_step,
+            'successful_steps': self._success_count,
+            'failed_steps': self._failed_count,
+            'step_details': list(self.step_details)
         } 
\ No newline at end of file
@@ -2,6 +2,23 @@ from typing import Dict, List, Optional
 import os
 from datetime import datetime
 
+# Emoji prefixes keyed by lowercase risk level
+_RISK_FORMAT = {
+    'high': "🔴 {}",
+    'critical': "🔴 {}",
+    'medium': "🟡 {}",
+    'moderate': "🟡 {}",
+    'low': "🟢 {}",
+    'minimal': "🟢 {}",
+}
+
+# Connection type keywords and their emoji prefixes, checked in this order
+_CONN_FORMAT = {
+    'private': "🔒 {}",
+    'public': "🌐 {}",
+    'service': "🔗 {}",
+}
+
 class ReportFormatter:
     """Utilities for formatting report elements"""
     
@@ -126,27 +143,13 @@ class ReportFormatter:
     @staticmethod
     def format_risk_level(level: str) -> str:
         """Format risk level with appropriate emoji"""
-        level_lower = level.lower()
-        
-        if level_lower in ['high', 'critical']:
-            return f"🔴 {level}"
-        elif level_lower in ['medium', 'moderate']:
-            return f"🟡 {level}"
-        elif level_lower in ['low', 'minimal']:
-            return f"🟢 {level}"
-        else:
-            return f"⚪ {level}"
+        return _RISK_FORMAT.get(level.lower(), "⚪ {}").format(level)
     
     @staticmethod
     def format_connection_type(conn_type: str) -> str:
         """Format connection type with appropriate emoji"""
         conn_lower = conn_type.lower()
-        
-        if 'private' in conn_lower:
-            return f"🔒 {conn_type}"
-        elif 'public' in conn_lower:
-            return f"🌐 {conn_type}"
-        elif 'service' in conn_lower:
-            return f"🔗 {conn_type}"
-        else:
-            return f"📡 {conn_type}" 
\ No newline at end of file
+        for keyword, template in _CONN_FORMAT.items():
+            if keyword in conn_lower:
+                return template.format(conn_type)
+        return f"📡 {conn_type}"
\ No newline at end of file
@@ -1,30 +1,66 @@
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import json
 import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-@dataclass
+# Mermaid node and edge templates for connected resources
+_PE_TMPL = '            {nid}["{name}<br/>({rtype})<br/>🔒 Private Endpoint"]\n'
+_PUB_TMPL = '            {nid}["{name}<br/>({rtype})<br/>⚠️ Public Access"]\n'
+_PLAIN_TMPL = '            {nid}["{name}<br/>({rtype})"]\n'
+_EDGE_SOLID = '            {parent} --> {nid}\n'
+_EDGE_DOTTED = '            {parent} -.-> {nid}\n'
+
+# Serialized results larger than this are left out of the Markdown report
+_MAX_EMBEDDED_JSON_CHARS = 512 * 1024
+
+# File buffer size used when saving reports
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Static report fragments
+_MERMAID_FOOTER = """        end
+    end
+    
+    classDef secure fill:#90EE90,stroke:#006400,stroke-width:2px
+    classDef warning fill:#FFE4B5,stroke:#FF8C00,stroke-width:2px
+    classDef default fill:#E6E6FA,stroke:#4B0082,stroke-width:1px"""
+
+_BEST_PRACTICES = """
+#### Best Practices
+
+1. **Use Private Endpoints**: Configure private endpoints for all critical resources
+2. **Disable Public Access**: Turn off public network access where possible
+3. **Implement Network Isolation**: Use managed VNet with approved outbound rules
+4. **Regular Security Reviews**: Periodically review and update network configurations
+5. **Monitor Access Logs**: Enable diagnostic logging for all resources
+"""
+
+@lru_cache(maxsize=128)
+def _pretty(value: str, sep: str = '_') -> str:
+    """Turn an identifier like 'allow_internet_outbound' into display text"""
+    return value.replace(sep, ' ').title()
+
+@dataclass(slots=True)
 class ReportSection:
     """Represents a section of the report"""
     title: str
     content: str
     level: int = 2  # Heading level
-    subsections: List['ReportSection'] = None
-    
-    def __post_init__(self):
-        if self.subsections is None:
-            self.subsections = []
 
 class BaseReportGenerator(ABC):
     """Base class for report generators"""
     
     def __init__(self, analysis_results: Dict[str, Any]):
         self.analysis_results = analysis_results
-        self.report_sections: List[ReportSection] = []
+        
+        # Read the clock once so every timestamp in the report agrees
+        self._now = datetime.now()
+        self._now_human = self._now.strftime('%Y-%m-%d %H:%M:%S')
         self.metadata = {
-            'generated_at': datetime.now().isoformat(),
+            'generated_at': self._now.isoformat(),
             'version': '1.0.0'
         }
     
@@ -41,91 +77,126 @@ class BaseReportGenerator(ABC):
 class MarkdownReportGenerator(BaseReportGenerator):
     """Generates Markdown reports with Mermaid diagrams"""
     
+    def __init__(self, analysis_results: Dict[str, Any]):
+        super().__init__(analysis_results)
+        self._json_cache: Optional[str] = None
+        self._rendered: Optional[str] = None
+    
     def generate(self) -> str:
         """Generate complete Markdown report"""
-        self._build_report_structure()
-        return self._render_markdown()
+        if self._rendered is None:
+            buf: List[str] = []
+            self._generate_into(buf)
+            self._rendered = ''.join(buf)
+        return self._rendered
     
-    def _build_report_structure(self):
-        """Build the report structure"""
-        # Executive Summary
-        self.report_sections.append(self._generate_executive_summary())
-        
-        # Network Configuration
-        self.report_sections.append(self._generate_network_section())
-        
-        # Connected Resources
-        self.report_sections.append(self._generate_resources_section())
-        
-        # Security Analysis
-        self.report_sections.append(self._generate_security_section())
-        
-        # Connectivity Diagram
-        self.report_sections.append(self._generate_connectivity_diagram())
+    def invalidate(self):
+        """Drop the cached report so the next call rebuilds it"""
+        self._json_cache = None
+        self._rendered = None
+    
+    def _bind_views(self):
+        """Bind the analysis result sub-dicts used by the section generators"""
+        results = self.analysis_results.get('results', {})
+        self._workspace = results.get('workspace', {})
+        self._network = results.get('network', {})
+        self._resources = results.get('connected_resources', {})
+        self._security = self._resources.get('security_summary', {})
+    
+    def _section_builders(self) -> List[Tuple[str, Callable[[], str]]]:
+        """Top-level report sections in order, as (title, content builder)"""
+        return [
+            ("Executive Summary", self._generate_executive_summary),
+            ("Network Configuration", self._generate_network_section),
+            ("Connected Resources", self._generate_resources_section),
+            ("Security Analysis", self._generate_security_section),
+            ("Connectivity Visualization", self._generate_connectivity_diagram),
+            ("Recommendations", self._generate_recommendations),
+            ("Detailed Findings", self._generate_detailed_findings)
+        ]
+    
+    def generate_sections(self) -> List[ReportSection]:
+        """Build the report as a list of structured sections"""
+        self._bind_views()
+        return [
+            ReportSection(title, build(), level=2)
+            for title, build in self._section_builders()
+        ]
+    
+    def _generate_into(self, buf: List[str]):
+        """Render the report into buf as a flat list of Markdown chunks"""
+        self._bind_views()
+        buf.append(self._render_header())
         
-        # Recommendations
-        self.report_sections.append(self._generate_recommendations())
+        for _, build in self._section_builders():
+            buf.append(build())
+            buf.append("\n")
         
-        # Detailed Findings
-        self.report_sections.append(self._generate_detailed_findings())
+        buf.append(self._render_footer())
     
-    def _generate_executive_summary(self) -> ReportSection:
+    def _generate_executive_summary(self) -> str:
         """Generate executive summary section"""
-        workspace_info = self.analysis_results.get('results', {}).get('workspace', {})
-        network_info = self.analysis_results.get('results', {}).get('network', {})
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
+        workspace_info = self._workspace
+        network_info = self._network
+        resources_info = self._resources
         
         content = f"""
 ## 📋 Executive Summary
 
 **Workspace:** {workspace_info.get('name', 'Unknown')}  
-**Type:** {workspace_info.get('hub_type', 'Unknown').replace('-', ' ').title()}  
+**Type:** {_pretty(workspace_info.get('hub_type', 'Unknown'), '-')}  
 **Location:** {workspace_info.get('location', 'Unknown')}  
-**Analysis Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Analysis Date:** {self._now_human}
 
 ### Key Findings
 
-- **Network Type:** {network_info.get('network_type', 'Unknown').replace('_', ' ').title()}
+- **Network Type:** {_pretty(network_info.get('network_type', 'Unknown'))}
 - **Isolation Mode:** {network_info.get('isolation_mode', 'Not configured')}
 - **Public Network Access:** {'⚠️ Enabled' if network_info.get('public_network_access') else '✅ Disabled'}
 - **Total Connected Resources:** {resources_info.get('total_resources', 0)}
-- **Average Security Score:** {resources_info.get('security_summary', {}).get('average_security_score', 0)}/100
+- **Average Security Score:** {self._security.get('average_security_score', 0)}/100
 
 ### Quick Status
 
 {self._generate_status_badges(network_info, resources_info)}
 """
-        return ReportSection("Executive Summary", content, level=2)
+        return content
     
     def _generate_status_badges(self, network_info: Dict, resources_info: Dict) -> str:
         """Generate status badges for quick overview"""
-        badges = []
+        # At most three badges: network, private endpoints, resource security
+        badges = [None] * 3
+        
+        public_access = network_info.get('public_network_access')
+        score = resources_info.get('security_summary', {}).get('average_security_score', 0)
         
         # Network security badge
-        if not network_info.get('public_network_access'):
-            badges.append("🛡️ **Private Network**")
+        if not public_access:
+            badges[0] = "🛡️ **Private Network**"
         else:
-            badges.append("⚠️ **Public Access Enabled**")
+            badges[0] = "⚠️ **Public Access Enabled**"
+        n = 1
         
         # Private endpoints
         pe_count = network_info.get('private_endpoints', {}).get('count', 0)
         if pe_count > 0:
-            badges.append(f"🔒 **{pe_count} Private Endpoints**")
+            badges[n] = f"🔒 **{pe_count} Private Endpoints**"
+            n += 1
         
         # Resources security
-        security_summary = resources_info.get('security_summary', {})
-        if security_summary.get('average_security_score', 0) >= 80:
-            badges.append("✅ **High Security**")
-        elif security_summary.get('average_security_score', 0) >= 60:
-            badges.append("⚠️ **Medium Security**")
+        if score >= 80:
+            badges[n] = "✅ **High Security**"
+        elif score >= 60:
+            badges[n] = "⚠️ **Medium Security**"
         else:
-            badges.append("❌ **Low Security**")
+            badges[n] = "❌ **Low Security**"
+        n += 1
             
-        return " | ".join(badges)
+        return " | ".join(badges[:n])
     
-    def _generate_network_section(self) -> ReportSection:
+    def _generate_network_section(self) -> str:
         """Generate network configuration section"""
-        network_info = self.analysis_results.get('results', {}).get('network', {})
+        network_info = self._network
         
         content = f"""
 ### Network Configuration
@@ -144,7 +215,7 @@ class MarkdownReportGenerator(BaseReportGenerator):
         if outbound_rules.get('count', 0) > 0:
             content += self._generate_outbound_rules_summary(outbound_rules)
         
-        return ReportSection("Network Configuration", content, level=2)
+        return content
     
     def _generate_managed_network_details(self, network_info: Dict) -> str:
         """Generate details for managed network"""
@@ -187,35 +258,46 @@ class MarkdownReportGenerator(BaseReportGenerator):
         if not nsgs:
             return "No Network Security Groups found."
         
-        table = "| NSG Name | Allow Rules | Deny Rules | Risk Level |\n"
-        table += "|----------|-------------|------------|------------|\n"
+        parts = [
+            "| NSG Name | Allow Rules | Deny Rules | Risk Level |\n",
+            "|----------|-------------|------------|------------|\n"
+        ]
+        append = parts.append
         
         for nsg in nsgs:
-            table += f"| {nsg.get('name', 'Unknown')} | "
-            table += f"{nsg.get('allow_rules_count', 0)} | "
-            table += f"{nsg.get('deny_rules_count', 0)} | "
-            table += f"{nsg.get('risk_level', 'Unknown')} |\n"
-        
-        return table
+            append(
+                f"| {nsg.get('name', 'Unknown')} | "
+                f"{nsg.get('allow_rules_count', 0)} | "
+                f"{nsg.get('deny_rules_count', 0)} | "
+                f"{nsg.get('risk_level', 'Unknown')} |\n"
+            )
+        
+        return ''.join(parts)
     
     def _generate_outbound_rules_summary(self, outbound_rules: Dict) -> str:
         """Generate outbound rules summary"""
         rules = outbound_rules.get('rules', {})
         
-        content = """
+        parts = ["""
 #### Outbound Rules Summary
 
 | Type | Count | Status |
 |------|-------|--------|
-"""
+"""]
+        append = parts.append
         
+        # Rule categories map to lists; anything without a length is skipped
         for rule_type, rule_list in rules.items():
-            if isinstance(rule_list, list) and rule_list:
-                content += f"| {rule_type.replace('_', ' ').title()} | {len(rule_list)} | Active |\n"
-        
-        return content
+            try:
+                count = len(rule_list)
+            except TypeError:
+                continue
+            if count:
+                append(f"| {_pretty(rule_type)} | {count} | Active |\n")
+        
+        return ''.join(parts)
     
-    def _generate_connectivity_diagram(self) -> ReportSection:
+    def _generate_connectivity_diagram(self) -> str:
         """Generate Mermaid connectivity diagram"""
         diagram = self._build_mermaid_diagram()
         
@@ -228,127 +310,133 @@ class MarkdownReportGenerator(BaseReportGenerator):
 
 This diagram shows the network connectivity between your workspace and connected resources.
 """
-        return ReportSection("Connectivity Visualization", content, level=2)
+        return content
     
     def _build_mermaid_diagram(self) -> str:
         """Build Mermaid diagram for connectivity"""
-        workspace_info = self.analysis_results.get('results', {}).get('workspace', {})
-        network_info = self.analysis_results.get('results', {}).get('network', {})
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
+        workspace_info = self._workspace
+        network_info = self._network
+        resources_info = self._resources
         
-        diagram = """graph TB
+        parts = ["""graph TB
     subgraph "Azure Subscription"
         subgraph "Resource Group"
-"""
+"""]
+        append = parts.append
         
         # Add workspace node
         workspace_name = workspace_info.get('name', 'Workspace')
         hub_type = workspace_info.get('hub_type', 'ml')
+        is_foundry = hub_type == 'azure-ai-foundry'
+        parent = 'Hub' if is_foundry else 'WS'
         
-        if hub_type == 'azure-ai-foundry':
-            diagram += f'            Hub["{workspace_name}<br/>(AI Foundry Hub)"]\n'
+        if is_foundry:
+            append(f'            Hub["{workspace_name}<br/>(AI Foundry Hub)"]\n')
         else:
-            diagram += f'            WS["{workspace_name}<br/>(ML Workspace)"]\n'
+            append(f'            WS["{workspace_name}<br/>(ML Workspace)"]\n')
         
         # Add network configuration
         if network_info.get('network_type') == 'managed':
-            diagram += '            ManagedVNet["Managed VNet<br/>(Microsoft-managed)"]\n'
-            if hub_type == 'azure-ai-foundry':
-                diagram += '            Hub --> ManagedVNet\n'
-            else:
-                diagram += '            WS --> ManagedVNet\n'
+            append('            ManagedVNet["Managed VNet<br/>(Microsoft-managed)"]\n')
+            append(f'            {parent} --> ManagedVNet\n')
         elif network_info.get('network_type') == 'customer':
-            diagram += '            CustomerVNet["Customer VNet<br/>(Customer-managed)"]\n'
-            if hub_type == 'azure-ai-foundry':
-                diagram += '            Hub --> CustomerVNet\n'
-            else:
-                diagram += '            WS --> CustomerVNet\n'
+            append('            CustomerVNet["Customer VNet<br/>(Customer-managed)"]\n')
+            append(f'            {parent} --> CustomerVNet\n')
         
-        # Add resources
+        # Add resources; Mermaid does not care about declaration order, so
+        # all nodes are emitted first and all edges after them
         resources_by_type = resources_info.get('resources_by_type', {})
+        nodes = []
+        edges = []
         
         for resource_type, resources in resources_by_type.items():
             for idx, resource in enumerate(resources):
                 node_id = f"{resource_type}{idx}"
-                resource_name = resource.get('name', 'Unknown')
                 
                 # Style based on access method
                 if resource.get('access_method') == 'private-endpoint':
-                    diagram += f'            {node_id}["{resource_name}<br/>({resource_type})<br/>🔒 Private Endpoint"]\n'
+                    node_tmpl = _PE_TMPL
                 elif resource.get('public_access'):
-                    diagram += f'            {node_id}["{resource_name}<br/>({resource_type})<br/>⚠️ Public Access"]\n'
+                    node_tmpl = _PUB_TMPL
                 else:
-                    diagram += f'            {node_id}["{resource_name}<br/>({resource_type})"]\n'
+                    node_tmpl = _PLAIN_TMPL
+                nodes.append(node_tmpl.format(
+                    nid=node_id, name=resource.get('name', 'Unknown'), rtype=resource_type
+                ))
                 
                 # Add connections
-                if hub_type == 'azure-ai-foundry':
-                    if resource.get('connection_type') == 'default':
-                        diagram += f'            Hub -.-> {node_id}\n'
-                    else:
-                        diagram += f'            Hub --> {node_id}\n'
-                else:
-                    if resource.get('connection_type') == 'default':
-                        diagram += f'            WS -.-> {node_id}\n'
-                    else:
-                        diagram += f'            WS --> {node_id}\n'
+                edge_tmpl = _EDGE_DOTTED if resource.get('connection_type') == 'default' else _EDGE_SOLID
+                edges.append(edge_tmpl.format(parent=parent, nid=node_id))
         
-        diagram += """        end
-    end
-    
-    classDef secure fill:#90EE90,stroke:#006400,stroke-width:2px
-    classDef warning fill:#FFE4B5,stroke:#FF8C00,stroke-width:2px
-    classDef default fill:#E6E6FA,stroke:#4B0082,stroke-width:1px"""
+        parts.extend(nodes)
+        parts.extend(edges)
+        append(_MERMAID_FOOTER)
         
-        return diagram
+        return ''.join(parts)
     
-    def _generate_resources_section(self) -> ReportSection:
+    def _generate_resources_section(self) -> str:
         """Generate connected resources section"""
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
+        resources_info = self._resources
         
-        content = """
+        parts = ["""
 ### Connected Resources Overview
 
-"""
+"""]
+        append = parts.append
         
         # Resources by type table
         resources_by_type = resources_info.get('resources_by_type', {})
         
         if resources_by_type:
-            content += "| Resource Type | Count | Avg Security Score |\n"
-            content += "|---------------|-------|-------------------|\n"
-            
-            for resource_type, resources in resources_by_type.items():
-                avg_score = sum(r.get('security_score', 0) for r in resources) / len(resources) if resources else 0
-                content += f"| {resource_type} | {len(resources)} | {avg_score:.1f}/100 |\n"
+            append("| Resource Type | Count | Avg Security Score |\n")
+            append("|---------------|-------|-------------------|\n")
         
-        # Detailed resource tables
+        # Detailed resource tables are built in the same pass that sums the
+        # scores for the overview table
+        details = []
         for resource_type, resources in resources_by_type.items():
-            content += f"\n#### {resource_type}\n\n"
-            content += self._generate_resource_table(resources)
+            table, total_score = self._generate_resource_table(resources)
+            avg_score = total_score / len(resources) if resources else 0
+            append(f"| {resource_type} | {len(resources)} | {avg_score:.1f}/100 |\n")
+            details.append(f"\n#### {resource_type}\n\n")
+            details.append(table)
+        
+        parts.extend(details)
         
-        return ReportSection("Connected Resources", content, level=2)
+        return ''.join(parts)
     
-    def _generate_resource_table(self, resources: List[Dict]) -> str:
-        """Generate table for specific resource type"""
+    def _generate_resource_table(self, resources: List[Dict]) -> Tuple[str, float]:
+        """Generate table for specific resource type
+        
+        Returns the table and the total security score of the resources.
+        """
         if not resources:
-            return "No resources found.\n"
+            return "No resources found.\n", 0
         
-        table = "| Name | Resource Group | Access Method | Public Access | Security Score |\n"
-        table += "|------|----------------|---------------|---------------|----------------|\n"
+        parts = [
+            "| Name | Resource Group | Access Method | Public Access | Security Score |\n",
+            "|------|----------------|---------------|---------------|----------------|\n"
+        ]
+        append = parts.append
+        total_score = 0
         
         for resource in resources:
+            score = resource.get('security_score')
+            total_score += score or 0
             public_access = "⚠️ Yes" if resource.get('public_access') else "✅ No"
-            table += f"| {resource.get('name')} | {resource.get('resource_group')} | "
-            table += f"{resource.get('access_method')} | {public_access} | "
-            table += f"{resource.get('security_score')}/100 |\n"
+            append(
+                f"| {resource.get('name')} | {resource.get('resource_group')} | "
+                f"{resource.get('access_method')} | {public_access} | "
+                f"{score}/100 |\n"
+            )
         
-        return table
+        return ''.join(parts), total_score
     
-    def _generate_security_section(self) -> ReportSection:
+    def _generate_security_section(self) -> str:
         """Generate security analysis section"""
-        network_info = self.analysis_results.get('results', {}).get('network', {})
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
-        security_summary = resources_info.get('security_summary', {})
+        network_info = self._network
+        resources_info = self._resources
+        security_summary = self._security
         
         content = f"""
 ### Security Analysis
@@ -369,7 +457,7 @@ This diagram shows the network connectivity between your workspace and connected
         for finding in findings:
             content += f"- {finding}\n"
         
-        return ReportSection("Security Analysis", content, level=2)
+        return content
     
     def _calculate_network_security_level(self, network_info: Dict) -> str:
         """Calculate overall network security level"""
@@ -400,17 +488,16 @@ This diagram shows the network connectivity between your workspace and connected
         
         return findings
     
-    def _generate_recommendations(self) -> ReportSection:
+    def _generate_recommendations(self) -> str:
         """Generate recommendations section"""
         all_recommendations = []
         
         # Collect recommendations from different sections
-        network_info = self.analysis_results.get('results', {}).get('network', {})
+        network_info = self._network
         if 'recommendations' in network_info:
             all_recommendations.extend(network_info['recommendations'])
         
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
-        security_summary = resources_info.get('security_summary', {})
+        security_summary = self._security
         if 'recommendations' in security_summary:
             all_recommendations.extend(security_summary['recommendations'])
         
@@ -428,75 +515,96 @@ Based on the analysis, here are our recommendations to improve your security pos
             content += "✅ No critical security recommendations at this time.\n"
         
         # Add best practices
-        content += """
-#### Best Practices
-
-1. **Use Private Endpoints**: Configure private endpoints for all critical resources
-2. **Disable Public Access**: Turn off public network access where possible
-3. **Implement Network Isolation**: Use managed VNet with approved outbound rules
-4. **Regular Security Reviews**: Periodically review and update network configurations
-5. **Monitor Access Logs**: Enable diagnostic logging for all resources
-"""
+        content += _BEST_PRACTICES
         
-        return ReportSection("Recommendations", content, level=2)
+        return content
     
-    def _generate_detailed_findings(self) -> ReportSection:
+    def _generate_detailed_findings(self) -> str:
         """Generate detailed findings section"""
-        content = """
+        serialized = self._json_blob()
+        
+        # Large results only go to the JSON sidecar written by save()
+        if len(serialized) > _MAX_EMBEDDED_JSON_CHARS:
+            content = f"""
+### Detailed Analysis Results
+
+Detailed results omitted from Markdown ({len(serialized) // 1024} KiB) — see sidecar .json
+"""
+            return content
+        
+        content = ''.join([
+            """
 ### Detailed Analysis Results
 
 <details>
 <summary>Click to expand detailed JSON results</summary>
 
 ```json
-"""
-        
-        # Pretty print the analysis results
-        content += json.dumps(self.analysis_results, indent=2, default=str)
-        
-        content += """
+""",
+            serialized,
+            """
 ```
 
 </details>
 """
+        ])
         
-        return ReportSection("Detailed Findings", content, level=2)
+        return content
     
-    def _render_markdown(self) -> str:
-        """Render all sections to Markdown"""
-        workspace_info = self.analysis_results.get('results', {}).get('workspace', {})
-        hub_type = workspace_info.get('hub_type', 'ML').replace('-', ' ').title()
-        
-        output = f"# Azure {hub_type} Connectivity Analysis Report\n\n"
-        
-        for section in self.report_sections:
-            output += self._render_section(section)
-        
-        # Add footer
-        output += f"\n---\n\n*Report generated on {datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}*\n"
-        
-        return output
+    def _json_blob(self) -> str:
+        """Serialize the analysis results once and reuse the result"""
+        if self._json_cache is None:
+            self._json_cache = json.dumps(self.analysis_results, indent=2, default=str)
+        return self._json_cache
     
-    def _render_section(self, section: ReportSection) -> str:
-        """Render a single section"""
-        output = section.content + "\n"
-        
-        for subsection in section.subsections:
-            output += self._render_section(subsection)
-        
-        return output
+    def _render_header(self) -> str:
+        """Render the report title"""
+        hub_type = _pretty(self._workspace.get('hub_type', 'ML'), '-')
+        return f"# Azure {hub_type} Connectivity Analysis Report\n\n"
+    
+    def _render_footer(self) -> str:
+        """Render the report footer"""
+        return f"\n---\n\n*Report generated on {self._now.strftime('%Y-%m-%d at %H:%M:%S')}*\n"
     
     def save(self, filepath: str):
         """Save report to file"""
-        report_content = self.generate()
+        if self._rendered is not None:
+            chunks = [self._rendered]
+        else:
+            chunks = []
+            self._generate_into(chunks)
         
         # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(report_content)
-        
-        # Also save JSON version
-        json_filepath = filepath.replace('.md', '.json')
-        with open(json_filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.analysis_results, f, indent=2, default=str) 
\ No newline at end of file
+        report_dir = os.path.dirname(filepath)
+        if report_dir:
+            os.makedirs(report_dir, exist_ok=True)
+        
+        # Also save JSON version next to the report
+        base, _ = os.path.splitext(filepath)
+        json_filepath = base + '.json'
+        
+        # The two files are independent, so overlap their writes
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            md_future = executor.submit(_write_markdown, filepath, chunks)
+            json_future = executor.submit(
+                _write_json, json_filepath, self.analysis_results, self._json_cache
+            )
+            md_future.result()
+            json_future.result()
+
+def _write_markdown(filepath: str, chunks: List[str]):
+    """Write rendered Markdown chunks to filepath
+    
+    The chunks go out in one batched write instead of being joined first;
+    the large buffer keeps the number of syscalls low.
+    """
+    with open(filepath, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+        f.writelines(chunks)
+
+def _write_json(filepath: str, analysis_results: Dict[str, Any], serialized: Optional[str] = None):
+    """Write analysis results as JSON, reusing an existing serialization"""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        if serialized is not None:
+            f.write(serialized)
+        else:
+            json.dump(analysis_results, f, indent=2, default=str)
\ No newline at end of file
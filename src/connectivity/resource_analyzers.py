@@ -1,353 +1,514 @@
-from typing import Dict, List, Optional
-import json
+from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import functools
+import itertools
 import subprocess
+import threading
+import time
+
+from .azure_api import arm_get, flatten_properties, graph_rows, run_az_json, with_subscription
+
+# Shared pool for the independent az CLI calls issued per resource
+_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+# How long az ... show results are reused, in seconds
+CACHE_TTL = 60.0
+
+# (helper, *args) -> (fetched_at, result) for the cached show helpers below
+_META_CACHE: Dict[tuple, Tuple[float, Any]] = {}
+_META_LOCK = threading.Lock()
+
+def _ttl_cache(ttl: float = CACHE_TTL):
+    """Reuse a helper's successful result for the same arguments for ttl seconds"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + args
+            with _META_LOCK:
+                entry = _META_CACHE.get(key)
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+            
+            value = func(*args)
+            if value is not None:
+                with _META_LOCK:
+                    _META_CACHE[key] = (time.monotonic(), value)
+            return value
+        return wrapper
+    return decorator
+
+# Static az command prefixes; callers append the per-resource arguments
+_CMD_STORAGE_SHOW = ('az', 'storage', 'account', 'show', '--output', 'json')
+_CMD_KV_SHOW = ('az', 'keyvault', 'show', '--output', 'json')
+_CMD_ACR_SHOW = ('az', 'acr', 'show', '--output', 'json')
+_CMD_CS_SHOW = ('az', 'cognitiveservices', 'account', 'show', '--output', 'json')
+_CMD_STORAGE_CONTAINERS = (
+    'az', 'storage', 'container', 'list',
+    '--query', "[].{name: name, public_access: properties.publicAccess || 'None'}",
+    '--output', 'json'
+)
+# The file service does not accept OAuth for listing shares, so use the
+# management-plane share listing instead
+_CMD_STORAGE_SHARES = (
+    'az', 'storage', 'share-rm', 'list',
+    '--query', '[].{name: name, quota: shareQuota}',
+    '--output', 'json'
+)
+_CMD_STORAGE_QUEUES = ('az', 'storage', 'queue', 'list', '--output', 'json')
+_CMD_STORAGE_TABLES = ('az', 'storage', 'table', 'list', '--output', 'json')
+# Data-plane listings try the signed-in identity first; that needs a data RBAC
+# role (e.g. Storage Blob Data Reader), so failures are retried with the account key
+_STORAGE_LOGIN_AUTH = ('--auth-mode', 'login')
+_CMD_STORAGE_KEYS = ('az', 'storage', 'account', 'keys', 'list', '--query', '[0].value', '--output', 'json')
+_STORAGE_DATA_PLANE_JOBS = {
+    'containers': _CMD_STORAGE_CONTAINERS,
+    'queues': _CMD_STORAGE_QUEUES,
+    'tables': _CMD_STORAGE_TABLES
+}
+# Only the counts are kept, so let the CLI reduce each listing to its length
+_CMD_KV_SECRETS = ('az', 'keyvault', 'secret', 'list', '--query', 'length(@)', '--output', 'json')
+_CMD_KV_KEYS = ('az', 'keyvault', 'key', 'list', '--query', 'length(@)', '--output', 'json')
+_CMD_KV_CERTIFICATES = ('az', 'keyvault', 'certificate', 'list', '--query', 'length(@)', '--output', 'json')
+_CMD_ACR_REPOSITORIES = ('az', 'acr', 'repository', 'list', '--output', 'json')
+_CMD_ACR_WEBHOOKS = (
+    'az', 'acr', 'webhook', 'list',
+    '--query', '[].{name: name, status: status, actions: actions || `[]`}',
+    '--output', 'json'
+)
+_CMD_ACR_REPLICATIONS = (
+    'az', 'acr', 'replication', 'list',
+    '--query', '[].{name: name, location: location, status: provisioningState}',
+    '--output', 'json'
+)
+
+@_ttl_cache()
+def _get_storage_info(name: str, resource_group: str, subscription_id: Optional[str]):
+    """az storage account show, served from ARM REST when possible"""
+    resource = arm_get(
+        f"resourceGroups/{resource_group}/providers/Microsoft.Storage/storageAccounts/{name}",
+        subscription_id, '2023-01-01')
+    if resource is not None:
+        return flatten_properties(resource)
+    return run_az_json(with_subscription(
+        [*_CMD_STORAGE_SHOW, '--name', name, '--resource-group', resource_group],
+        subscription_id))
+
+@_ttl_cache()
+def _get_kv_info(name: str, subscription_id: Optional[str]):
+    """az keyvault show"""
+    return run_az_json(with_subscription([*_CMD_KV_SHOW, '--name', name], subscription_id))
+
+@_ttl_cache()
+def _get_acr_info(name: str, resource_group: str, subscription_id: Optional[str]):
+    """az acr show, served from ARM REST when possible"""
+    resource = arm_get(
+        f"resourceGroups/{resource_group}/providers/Microsoft.ContainerRegistry/registries/{name}",
+        subscription_id, '2023-07-01')
+    if resource is not None:
+        return flatten_properties(resource)
+    return run_az_json(with_subscription(
+        [*_CMD_ACR_SHOW, '--name', name, '--resource-group', resource_group],
+        subscription_id))
+
+@_ttl_cache()
+def _get_cs_info(name: str, resource_group: str, subscription_id: Optional[str]):
+    """az cognitiveservices account show, served from ARM REST when possible"""
+    resource = arm_get(
+        f"resourceGroups/{resource_group}/providers/Microsoft.CognitiveServices/accounts/{name}",
+        subscription_id, '2023-05-01')
+    if resource is not None:
+        return resource
+    return run_az_json(with_subscription(
+        [*_CMD_CS_SHOW, '--name', name, '--resource-group', resource_group],
+        subscription_id))
+
+@functools.lru_cache(maxsize=None)
+def _get_current_oid() -> Optional[str]:
+    """Object id of the signed-in user, looked up once per run (None for service principals)"""
+    try:
+        return run_az_json(['az', 'ad', 'signed-in-user', 'show',
+                          '--query', 'id',
+                          '--output', 'json'])
+    except subprocess.TimeoutExpired:
+        return None
+
+# Key Vault count field -> access policy permission group needed to list it
+_KV_LIST_PERMISSIONS = {
+    'secrets_count': 'secrets',
+    'keys_count': 'keys',
+    'certificates_count': 'certificates'
+}
+
+def _command_name(cmd: List[str]) -> str:
+    """The az command words of cmd, without its options"""
+    return ' '.join(itertools.takewhile(lambda arg: not arg.startswith('-'), cmd))
+
+def _run_all(jobs: Dict[str, List[str]]) -> Dict:
+    """Run independent az CLI commands concurrently, keyed like jobs
+    
+    The last command runs on the calling thread, which would otherwise just
+    wait, so n commands only occupy n - 1 pool threads.
+    """
+    if not jobs:
+        return {}
+    *pooled, (last_key, last_cmd) = jobs.items()
+    futures = {key: _EXECUTOR.submit(run_az_json, cmd) for key, cmd in pooled}
+    results = {last_key: run_az_json(last_cmd)}
+    results.update((key, future.result()) for key, future in futures.items())
+    return results
+
+def _parse_resource_id(resource_id: str) -> Optional[Tuple[str, str, str]]:
+    """(subscription, resource group, name) of an ARM resource id, or None if malformed"""
+    parts = resource_id.strip('/').split('/')
+    if len(parts) < 8 or parts[0].lower() != 'subscriptions' or parts[2].lower() != 'resourcegroups':
+        return None
+    return parts[1], parts[3], parts[-1]
+
+def _bulk_analyze(resource_ids: List[str], show_helper, shape, key_args, analyze) -> Dict[str, Any]:
+    """Prime show_helper's cache from one Resource Graph lookup, then analyze each resource
+    
+    key_args maps (subscription, resource group, name) to the arguments shared
+    by show_helper and analyze, so each analysis finds its resource cached.
+    """
+    rows = graph_rows(resource_ids)
+    now = time.monotonic()
+    results = {}
+    for resource_id in resource_ids:
+        parsed = _parse_resource_id(resource_id)
+        if parsed is None:
+            continue
+        args = key_args(*parsed)
+        
+        row = rows.get(resource_id.lower())
+        if row is not None:
+            with _META_LOCK:
+                _META_CACHE[(show_helper.__name__,) + args] = (now, shape(row))
+        results[resource_id] = analyze(*args)
+    return results
+
+@dataclass(slots=True)
+class ContainerInfo:
+    """A blob container and its public access level"""
+    name: str
+    public_access: str = 'None'
+
+@dataclass(slots=True)
+class FileShareInfo:
+    """A file share and its quota in GiB"""
+    name: str
+    quota: Optional[int] = None
+
+@dataclass(slots=True)
+class AccessPolicyInfo:
+    """A Key Vault access policy entry"""
+    object_id: Optional[str]
+    permissions: Dict[str, List[str]] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class WebhookInfo:
+    """A container registry webhook"""
+    name: str
+    status: Optional[str] = None
+    actions: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class ReplicationInfo:
+    """A container registry geo-replication"""
+    name: str
+    location: Optional[str] = None
+    status: Optional[str] = None
+
+@dataclass(slots=True)
+class StorageAnalysis:
+    """Result of StorageAnalyzer.analyze_detailed"""
+    containers: List[ContainerInfo] = field(default_factory=list)
+    file_shares: List[FileShareInfo] = field(default_factory=list)
+    queues: List[Dict] = field(default_factory=list)
+    tables: List[Dict] = field(default_factory=list)
+    encryption: Dict = field(default_factory=dict)
+    lifecycle_policies: List[Dict] = field(default_factory=list)
+    cors_rules: Dict = field(default_factory=dict)
+    static_website: bool = False
+    errors: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class KeyVaultAnalysis:
+    """Result of KeyVaultAnalyzer.analyze_detailed"""
+    access_policies: List[AccessPolicyInfo] = field(default_factory=list)
+    rbac_enabled: bool = False
+    soft_delete_enabled: bool = False
+    purge_protection_enabled: bool = False
+    secrets_count: int = 0
+    keys_count: int = 0
+    certificates_count: int = 0
+    errors: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class ContainerRegistryAnalysis:
+    """Result of ContainerRegistryAnalyzer.analyze_detailed"""
+    sku: str = 'Basic'
+    admin_enabled: bool = False
+    public_access: bool = True
+    repositories: List[str] = field(default_factory=list)
+    webhooks: List[WebhookInfo] = field(default_factory=list)
+    replications: List[ReplicationInfo] = field(default_factory=list)
+    retention_policy: Dict = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class CognitiveServicesAnalysis:
+    """Result of CognitiveServicesAnalyzer.analyze_detailed"""
+    kind: str = 'Unknown'
+    sku: Dict = field(default_factory=dict)
+    custom_subdomain: bool = False
+    endpoints: Dict = field(default_factory=dict)
+    api_properties: Dict = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
 
 class StorageAnalyzer:
     """Detailed analysis for storage accounts"""
     
+    @classmethod
+    def bulk_analyze(cls, resource_ids: List[str]) -> Dict[str, StorageAnalysis]:
+        """Analyze many storage accounts by resource id, fetching their ARM properties in one Resource Graph query"""
+        return _bulk_analyze(resource_ids, _get_storage_info, flatten_properties,
+                             lambda subscription_id, resource_group, name: (name, resource_group, subscription_id),
+                             cls.analyze_detailed)
+    
     @staticmethod
     def analyze_detailed(storage_account_name: str, resource_group: str,
-                        subscription_id: Optional[str] = None) -> Dict:
+                        subscription_id: Optional[str] = None) -> StorageAnalysis:
         """Perform detailed storage account analysis"""
-        analysis = {
-            'containers': [],
-            'file_shares': [],
-            'queues': [],
-            'tables': [],
-            'encryption': {},
-            'lifecycle_policies': [],
-            'cors_rules': {},
-            'static_website': False
-        }
+        analysis = StorageAnalysis()
         
         try:
-            # Get storage account keys (needed for further operations)
-            cmd_keys = ['az', 'storage', 'account', 'keys', 'list',
-                       '--account-name', storage_account_name,
-                       '--resource-group', resource_group,
-                       '--output', 'json']
+            # Data-plane listings authenticate with the signed-in identity, so no
+            # account keys lookup is needed before they can start
+            jobs = {
+                key: [*cmd, *_STORAGE_LOGIN_AUTH, '--account-name', storage_account_name]
+                for key, cmd in _STORAGE_DATA_PLANE_JOBS.items()
+            }
+            jobs['shares'] = with_subscription(
+                [*_CMD_STORAGE_SHARES,
+                 '--storage-account', storage_account_name,
+                 '--resource-group', resource_group], subscription_id)
             
-            if subscription_id:
-                cmd_keys.extend(['--subscription', subscription_id])
-                
-            result = subprocess.run(cmd_keys, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                keys = json.loads(result.stdout)
-                account_key = keys[0]['value'] if keys else None
-                
+            # Encryption and endpoints both come from the one account GET,
+            # which runs alongside the listings
+            info_future = _EXECUTOR.submit(_get_storage_info, storage_account_name,
+                                           resource_group, subscription_id)
+            results = _run_all(jobs)
+            
+            # Without a data-plane role the login listings fail; retry those with the account key
+            failed = [key for key in _STORAGE_DATA_PLANE_JOBS if results[key] is None]
+            if failed:
+                account_key = run_az_json(with_subscription(
+                    [*_CMD_STORAGE_KEYS,
+                     '--account-name', storage_account_name,
+                     '--resource-group', resource_group], subscription_id))
                 if account_key:
-                    # List containers
-                    cmd_containers = ['az', 'storage', 'container', 'list',
-                                    '--account-name', storage_account_name,
-                                    '--account-key', account_key,
-                                    '--output', 'json']
-                    
-                    result = subprocess.run(cmd_containers, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        containers = json.loads(result.stdout)
-                        for container in containers:
-                            analysis['containers'].append({
-                                'name': container.get('name'),
-                                'public_access': container.get('properties', {}).get('publicAccess', 'None')
-                            })
-                    
-                    # List file shares
-                    cmd_shares = ['az', 'storage', 'share', 'list',
-                                '--account-name', storage_account_name,
-                                '--account-key', account_key,
-                                '--output', 'json']
-                    
-                    result = subprocess.run(cmd_shares, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        shares = json.loads(result.stdout)
-                        for share in shares:
-                            analysis['file_shares'].append({
-                                'name': share.get('name'),
-                                'quota': share.get('properties', {}).get('quota')
-                            })
-                    
-                    # List queues
-                    cmd_queues = ['az', 'storage', 'queue', 'list',
-                                '--account-name', storage_account_name,
-                                '--account-key', account_key,
-                                '--output', 'json']
-                    
-                    result = subprocess.run(cmd_queues, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        analysis['queues'] = json.loads(result.stdout)
-                    
-                    # List tables
-                    cmd_tables = ['az', 'storage', 'table', 'list',
-                                '--account-name', storage_account_name,
-                                '--account-key', account_key,
-                                '--output', 'json']
-                    
-                    result = subprocess.run(cmd_tables, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        analysis['tables'] = json.loads(result.stdout)
-                    
-                    # Get encryption settings
-                    cmd_encryption = ['az', 'storage', 'account', 'show',
-                                    '--name', storage_account_name,
-                                    '--resource-group', resource_group,
-                                    '--output', 'json']
+                    results.update(_run_all({
+                        key: [*_STORAGE_DATA_PLANE_JOBS[key],
+                              '--account-name', storage_account_name,
+                              '--account-key', account_key]
+                        for key in failed
+                    }))
+            
+            # Containers and file shares (already projected by --query)
+            if results['containers'] is not None:
+                analysis.containers = [ContainerInfo(**row) for row in results['containers']]
+            if results['shares'] is not None:
+                analysis.file_shares = [FileShareInfo(**row) for row in results['shares']]
+            
+            # Queues and tables
+            if results['queues'] is not None:
+                analysis.queues = results['queues']
+            if results['tables'] is not None:
+                analysis.tables = results['tables']
+            
+            # Encryption settings
+            storage_info = info_future.result()
+            if storage_info is not None:
+                analysis.encryption = storage_info.get('encryption', {})
+                analysis.static_website = storage_info.get('primaryEndpoints', {}).get('web') is not None
                     
-                    if subscription_id:
-                        cmd_encryption.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_encryption, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        storage_info = json.loads(result.stdout)
-                        analysis['encryption'] = storage_info.get('encryption', {})
-                        analysis['static_website'] = storage_info.get('primaryEndpoints', {}).get('web') is not None
-                            
-        except Exception as e:
-            # Log but continue
-            pass
+        except subprocess.TimeoutExpired as e:
+            # The remaining calls would most likely time out too, so stop here
+            analysis.errors.append(f"Timed out after {e.timeout}s: {_command_name(e.cmd)}")
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            analysis.errors.append(f"Unexpected az output: {e!r}")
             
         return analysis
 
 class KeyVaultAnalyzer:
     """Detailed analysis for Key Vaults"""
     
+    @classmethod
+    def bulk_analyze(cls, resource_ids: List[str]) -> Dict[str, KeyVaultAnalysis]:
+        """Analyze many Key Vaults by resource id, fetching their ARM properties in one Resource Graph query"""
+        return _bulk_analyze(resource_ids, _get_kv_info, dict,
+                             lambda subscription_id, resource_group, name: (name, subscription_id),
+                             cls.analyze_detailed)
+    
     @staticmethod
-    def analyze_detailed(key_vault_name: str, subscription_id: Optional[str] = None) -> Dict:
+    def analyze_detailed(key_vault_name: str, subscription_id: Optional[str] = None) -> KeyVaultAnalysis:
         """Perform detailed Key Vault analysis"""
-        analysis = {
-            'access_policies': [],
-            'rbac_enabled': False,
-            'soft_delete_enabled': False,
-            'purge_protection_enabled': False,
-            'secrets_count': 0,
-            'keys_count': 0,
-            'certificates_count': 0
-        }
+        analysis = KeyVaultAnalysis()
         
         try:
             # Get Key Vault details
-            cmd = ['az', 'keyvault', 'show',
-                   '--name', key_vault_name,
-                   '--output', 'json']
-            
-            if subscription_id:
-                cmd.extend(['--subscription', subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                kv_info = json.loads(result.stdout)
+            kv_info = _get_kv_info(key_vault_name, subscription_id)
+            if kv_info is not None:
                 properties = kv_info.get('properties', {})
                 
                 # Extract security settings
-                analysis['rbac_enabled'] = properties.get('enableRbacAuthorization', False)
-                analysis['soft_delete_enabled'] = properties.get('enableSoftDelete', False)
-                analysis['purge_protection_enabled'] = properties.get('enablePurgeProtection', False)
+                analysis.rbac_enabled = properties.get('enableRbacAuthorization', False)
+                analysis.soft_delete_enabled = properties.get('enableSoftDelete', False)
+                analysis.purge_protection_enabled = properties.get('enablePurgeProtection', False)
                 
                 # Get access policies
                 access_policies = properties.get('accessPolicies', [])
-                for policy in access_policies:
-                    analysis['access_policies'].append({
-                        'object_id': policy.get('objectId'),
-                        'permissions': policy.get('permissions', {})
-                    })
+                analysis.access_policies = [
+                    AccessPolicyInfo(policy.get('objectId'), policy.get('permissions', {}))
+                    for policy in access_policies
+                ]
                 
-                # Count secrets (requires permissions)
-                try:
-                    cmd_secrets = ['az', 'keyvault', 'secret', 'list',
-                                 '--vault-name', key_vault_name,
-                                 '--output', 'json']
-                    
-                    if subscription_id:
-                        cmd_secrets.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_secrets, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        secrets = json.loads(result.stdout)
-                        analysis['secrets_count'] = len(secrets)
-                except:
-                    pass  # User may not have permissions
+                # Count secrets, keys and certificates (requires permissions)
+                jobs = {
+                    'secrets_count': [*_CMD_KV_SECRETS, '--vault-name', key_vault_name],
+                    'keys_count': [*_CMD_KV_KEYS, '--vault-name', key_vault_name],
+                    'certificates_count': [*_CMD_KV_CERTIFICATES, '--vault-name', key_vault_name]
+                }
                 
-                # Count keys (requires permissions)
-                try:
-                    cmd_keys = ['az', 'keyvault', 'key', 'list',
-                              '--vault-name', key_vault_name,
-                              '--output', 'json']
-                    
-                    if subscription_id:
-                        cmd_keys.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_keys, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        keys = json.loads(result.stdout)
-                        analysis['keys_count'] = len(keys)
-                except:
-                    pass  # User may not have permissions
+                if subscription_id:
+                    for job in jobs.values():
+                        job.extend(['--subscription', subscription_id])
                 
-                # Count certificates (requires permissions)
-                try:
-                    cmd_certs = ['az', 'keyvault', 'certificate', 'list',
-                               '--vault-name', key_vault_name,
-                               '--output', 'json']
-                    
-                    if subscription_id:
-                        cmd_certs.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_certs, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        certs = json.loads(result.stdout)
-                        analysis['certificates_count'] = len(certs)
-                except:
-                    pass  # User may not have permissions
+                # Skip listings the caller's own access policy does not allow,
+                # they would only come back with a permissions error
+                if not analysis.rbac_enabled and access_policies:
+                    caller_oid = _get_current_oid()
+                    caller_policy = next(
+                        (policy for policy in access_policies
+                         if caller_oid and policy.get('objectId') == caller_oid),
+                        None
+                    )
+                    if caller_policy is not None:
+                        permissions = caller_policy.get('permissions') or {}
+                        for key, group in _KV_LIST_PERMISSIONS.items():
+                            granted = {p.lower() for p in permissions.get(group) or []}
+                            if not granted & {'list', 'all'}:
+                                del jobs[key]
+                
+                for key, count in _run_all(jobs).items():
+                    if count is not None:  # User may not have permissions
+                        setattr(analysis, key, count)
                     
-        except Exception as e:
-            # Log but continue
-            pass
+        except subprocess.TimeoutExpired as e:
+            # The remaining calls would most likely time out too, so stop here
+            analysis.errors.append(f"Timed out after {e.timeout}s: {_command_name(e.cmd)}")
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            analysis.errors.append(f"Unexpected az output: {e!r}")
             
         return analysis
 
 class ContainerRegistryAnalyzer:
     """Detailed analysis for Container Registries"""
     
+    @classmethod
+    def bulk_analyze(cls, resource_ids: List[str]) -> Dict[str, ContainerRegistryAnalysis]:
+        """Analyze many container registries by resource id, fetching their ARM properties in one Resource Graph query"""
+        return _bulk_analyze(resource_ids, _get_acr_info, flatten_properties,
+                             lambda subscription_id, resource_group, name: (name, resource_group, subscription_id),
+                             cls.analyze_detailed)
+    
     @staticmethod
     def analyze_detailed(registry_name: str, resource_group: str,
-                        subscription_id: Optional[str] = None) -> Dict:
+                        subscription_id: Optional[str] = None) -> ContainerRegistryAnalysis:
         """Perform detailed Container Registry analysis"""
-        analysis = {
-            'sku': 'Basic',
-            'admin_enabled': False,
-            'public_access': True,
-            'repositories': [],
-            'webhooks': [],
-            'replications': [],
-            'retention_policy': {}
-        }
+        analysis = ContainerRegistryAnalysis()
         
         try:
             # Get registry details
-            cmd = ['az', 'acr', 'show',
-                   '--name', registry_name,
-                   '--resource-group', resource_group,
-                   '--output', 'json']
-            
-            if subscription_id:
-                cmd.extend(['--subscription', subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                acr_info = json.loads(result.stdout)
-                
-                analysis['sku'] = acr_info.get('sku', {}).get('name', 'Basic')
-                analysis['admin_enabled'] = acr_info.get('adminUserEnabled', False)
-                analysis['public_access'] = (
+            acr_info = _get_acr_info(registry_name, resource_group, subscription_id)
+            if acr_info is not None:
+                analysis.sku = acr_info.get('sku', {}).get('name', 'Basic')
+                analysis.admin_enabled = acr_info.get('adminUserEnabled', False)
+                analysis.public_access = (
                     acr_info.get('publicNetworkAccess', 'Enabled') == 'Enabled'
                 )
                 
-                # List repositories
-                cmd_repos = ['az', 'acr', 'repository', 'list',
-                           '--name', registry_name,
-                           '--output', 'json']
+                # The retention policy is part of the registry resource itself,
+                # so there is no need for a separate az acr config retention show.
+                # Retention is a Premium feature; other SKUs carry an inert default
+                if analysis.sku == 'Premium':
+                    retention_policy = (acr_info.get('policies') or {}).get('retentionPolicy')
+                    if retention_policy:
+                        analysis.retention_policy = retention_policy
                 
-                if subscription_id:
-                    cmd_repos.extend(['--subscription', subscription_id])
-                    
-                result = subprocess.run(cmd_repos, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    analysis['repositories'] = json.loads(result.stdout)
+                jobs = {
+                    'repositories': [*_CMD_ACR_REPOSITORIES, '--name', registry_name],
+                    'webhooks': [*_CMD_ACR_WEBHOOKS, '--registry', registry_name]
+                }
                 
-                # List webhooks
-                cmd_webhooks = ['az', 'acr', 'webhook', 'list',
-                              '--registry', registry_name,
-                              '--output', 'json']
+                # Replications are Premium SKU only
+                if analysis.sku == 'Premium':
+                    jobs['replications'] = [*_CMD_ACR_REPLICATIONS, '--registry', registry_name]
                 
                 if subscription_id:
-                    cmd_webhooks.extend(['--subscription', subscription_id])
-                    
-                result = subprocess.run(cmd_webhooks, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    webhooks = json.loads(result.stdout)
-                    for webhook in webhooks:
-                        analysis['webhooks'].append({
-                            'name': webhook.get('name'),
-                            'status': webhook.get('status'),
-                            'actions': webhook.get('actions', [])
-                        })
+                    for job in jobs.values():
+                        job.extend(['--subscription', subscription_id])
                 
-                # List replications (Premium SKU only)
-                if analysis['sku'] == 'Premium':
-                    cmd_replications = ['az', 'acr', 'replication', 'list',
-                                      '--registry', registry_name,
-                                      '--output', 'json']
-                    
-                    if subscription_id:
-                        cmd_replications.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_replications, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        replications = json.loads(result.stdout)
-                        for replication in replications:
-                            analysis['replications'].append({
-                                'name': replication.get('name'),
-                                'location': replication.get('location'),
-                                'status': replication.get('provisioningState')
-                            })
+                results = _run_all(jobs)
                 
-                # Get retention policy (if available)
-                try:
-                    cmd_retention = ['az', 'acr', 'config', 'retention', 'show',
-                                   '--registry', registry_name,
-                                   '--output', 'json']
-                    
-                    if subscription_id:
-                        cmd_retention.extend(['--subscription', subscription_id])
-                        
-                    result = subprocess.run(cmd_retention, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0:
-                        analysis['retention_policy'] = json.loads(result.stdout)
-                except:
-                    pass  # Retention policy may not be configured
+                if results['repositories'] is not None:
+                    analysis.repositories = results['repositories']
+                
+                # Webhooks and replications (already projected by --query)
+                if results['webhooks'] is not None:
+                    analysis.webhooks = [WebhookInfo(**row) for row in results['webhooks']]
+                if results.get('replications') is not None:
+                    analysis.replications = [ReplicationInfo(**row) for row in results['replications']]
                     
-        except Exception as e:
-            # Log but continue
-            pass
+        except subprocess.TimeoutExpired as e:
+            # The remaining calls would most likely time out too, so stop here
+            analysis.errors.append(f"Timed out after {e.timeout}s: {_command_name(e.cmd)}")
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            analysis.errors.append(f"Unexpected az output: {e!r}")
             
         return analysis
 
 class CognitiveServicesAnalyzer:
     """Detailed analysis for Cognitive Services"""
     
+    @classmethod
+    def bulk_analyze(cls, resource_ids: List[str]) -> Dict[str, CognitiveServicesAnalysis]:
+        """Analyze many Cognitive Services accounts by resource id, fetching their ARM properties in one Resource Graph query"""
+        return _bulk_analyze(resource_ids, _get_cs_info, dict,
+                             lambda subscription_id, resource_group, name: (name, resource_group, subscription_id),
+                             cls.analyze_detailed)
+    
     @staticmethod
     def analyze_detailed(service_name: str, resource_group: str,
-                        subscription_id: Optional[str] = None) -> Dict:
+                        subscription_id: Optional[str] = None) -> CognitiveServicesAnalysis:
         """Perform detailed Cognitive Services analysis"""
-        analysis = {
-            'kind': 'Unknown',
-            'sku': {},
-            'custom_subdomain': False,
-            'endpoints': {},
-            'api_properties': {}
-        }
+        analysis = CognitiveServicesAnalysis()
         
         try:
             # Get Cognitive Services details
-            cmd = ['az', 'cognitiveservices', 'account', 'show',
-                   '--name', service_name,
-                   '--resource-group', resource_group,
-                   '--output', 'json']
-            
-            if subscription_id:
-                cmd.extend(['--subscription', subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                cs_info = json.loads(result.stdout)
-                
-                analysis['kind'] = cs_info.get('kind', 'Unknown')
-                analysis['sku'] = cs_info.get('sku', {})
-                analysis['custom_subdomain'] = cs_info.get('properties', {}).get('customSubDomainName') is not None
-                analysis['endpoints'] = cs_info.get('properties', {}).get('endpoints', {})
-                analysis['api_properties'] = cs_info.get('properties', {}).get('apiProperties', {})
+            cs_info = _get_cs_info(service_name, resource_group, subscription_id)
+            if cs_info is not None:
+                analysis.kind = cs_info.get('kind', 'Unknown')
+                analysis.sku = cs_info.get('sku', {})
+                analysis.custom_subdomain = cs_info.get('properties', {}).get('customSubDomainName') is not None
+                analysis.endpoints = cs_info.get('properties', {}).get('endpoints', {})
+                analysis.api_properties = cs_info.get('properties', {}).get('apiProperties', {})
                     
-        except Exception as e:
-            # Log but continue
-            pass
+        except subprocess.TimeoutExpired as e:
+            # The remaining calls would most likely time out too, so stop here
+            analysis.errors.append(f"Timed out after {e.timeout}s: {_command_name(e.cmd)}")
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            analysis.errors.append(f"Unexpected az output: {e!r}")
             
         return analysis 
\ No newline at end of file
@@ -1,10 +1,45 @@
 from typing import Dict, List, Optional, Set
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from .base_analyzer import BaseAnalyzer, AnalysisResult
-import json
-import subprocess
+from .azure_api import AZ, arm_get, cached_az_json, flatten_properties, graph_rows, run_az_json
+import threading
 
-@dataclass
+# Concurrent az calls during discovery; the work is all CLI round-trips
+_MAX_WORKERS = 16
+
+# Fields discovery reads from each az ml listing, so large workspaces stay small in memory
+_LISTING_QUERIES = {
+    'compute': "[].{type: type || '', properties: properties || `{}`}",
+    'datastore': "[].{type: type || '', account_name: account_name}",
+    'connection': "[].{type: type || '', target: target}"
+}
+
+# How to analyze each resource type whose connectivity details come from ARM properties:
+# az show subcommand, whether it takes --resource-group, ARM api-version for REST lookups,
+# how network ACLs are recorded ('full', 'rules' or None) and the name used in warnings
+_ANALYZER_SPECS = {
+    'Microsoft.Storage/storageAccounts': {
+        'cmd': ('storage', 'account', 'show'), 'by_resource_group': True,
+        'api_version': '2023-01-01', 'network_acls': 'full', 'label': 'storage account'
+    },
+    'Microsoft.KeyVault/vaults': {
+        'cmd': ('keyvault', 'show'), 'by_resource_group': False,
+        'api_version': '2023-07-01', 'network_acls': 'rules', 'label': 'key vault'
+    },
+    'Microsoft.ContainerRegistry/registries': {
+        'cmd': ('acr', 'show'), 'by_resource_group': True,
+        'api_version': '2023-07-01', 'network_acls': None, 'label': 'container registry'
+    },
+    'Microsoft.CognitiveServices/accounts': {
+        'cmd': ('cognitiveservices', 'account', 'show'), 'by_resource_group': True,
+        'api_version': '2023-05-01', 'network_acls': None, 'label': 'cognitive services'
+    }
+}
+_ANALYZED_TYPES = tuple(_ANALYZER_SPECS)
+
+@dataclass(slots=True)
 class ConnectedResource:
     """Represents a connected Azure resource"""
     resource_id: str
@@ -17,6 +52,8 @@ class ConnectedResource:
     public_access_enabled: bool = True
     firewall_rules: List[Dict] = field(default_factory=list)
     network_acls: Dict = field(default_factory=dict)
+    short_type: str = ''  # last segment of resource_type, e.g. 'storageAccounts'
+    security_score: int = 0  # get_security_score() once analysis has finished
     
     def get_security_score(self) -> int:
         """Calculate security score (0-100)"""
@@ -37,10 +74,18 @@ class ResourceDiscovery(BaseAnalyzer):
     """Discovers and analyzes connected resources"""
     
     def __init__(self, workspace_name: str, resource_group: str,
-                 subscription_id: Optional[str] = None, hub_type: str = 'azure-ml'):
+                 subscription_id: Optional[str] = None, hub_type: str = 'azure-ml',
+                 use_cli: bool = False):
         super().__init__(workspace_name, resource_group, subscription_id, hub_type)
+        # Skip direct ARM REST lookups and shell out to az show for every resource
+        self.use_cli = use_cli
         self.connected_resources: List[ConnectedResource] = []
+        # Lower-cased ids of connected_resources; ARM ids are case-insensitive
+        self._resource_ids: Set[str] = set()
+        self._resources_lock = threading.Lock()
         self.resource_graph: Dict[str, List[str]] = {}
+        # Lower-cased resource id -> Resource Graph row, see _bulk_fetch_resource_details
+        self._resource_details: Dict[str, Dict] = {}
         
     def analyze(self) -> AnalysisResult:
         """Discover and analyze all connected resources"""
@@ -48,19 +93,35 @@ class ResourceDiscovery(BaseAnalyzer):
             # Get workspace configuration
             workspace_info = self._get_workspace_info()
             
-            # Discover default resources
-            self._discover_default_resources(workspace_info)
-            
-            # Discover associated resources
-            self._discover_associated_resources(workspace_info)
-            
-            # Discover user connections (AI Foundry specific)
-            if self.hub_type == 'azure-ai-foundry':
-                self._discover_user_connections()
-            
-            # Analyze each resource
-            for resource in self.connected_resources:
-                self._analyze_resource(resource)
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+                # The workspace listings are independent, so fetch them together;
+                # results are still applied in a fixed order below
+                kinds = ['compute', 'datastore']
+                if self.hub_type == 'azure-ai-foundry':
+                    kinds.append('connection')
+                listings = {kind: executor.submit(self._list_workspace_items, kind) for kind in kinds}
+                
+                # Discover default resources
+                self._discover_default_resources(workspace_info)
+                
+                # Discover associated resources
+                self._discover_associated_resources(workspace_info, listings)
+                
+                # Discover user connections (AI Foundry specific)
+                if self.hub_type == 'azure-ai-foundry':
+                    self._discover_user_connections(listings['connection'])
+                
+                # Fetch ARM details for all resources at once, then analyze each;
+                # each analyzer only touches its own resource. Only resources that
+                # still need a round-trip go to worker threads, the rest run here
+                self._bulk_fetch_resource_details()
+                remote, local = [], []
+                for resource in self.connected_resources:
+                    (remote if self._needs_lookup(resource) else local).append(resource)
+                lookups = executor.map(self._analyze_resource, remote)
+                for resource in local:
+                    self._analyze_resource(resource)
+                list(lookups)
             
             # Build resource dependency graph
             self._build_dependency_graph()
@@ -79,27 +140,6 @@ class ResourceDiscovery(BaseAnalyzer):
                 error=str(e)
             )
     
-    def _get_workspace_info(self) -> Dict:
-        """Get workspace information"""
-        try:
-            cmd = ['az', 'ml', 'workspace', 'show',
-                   '--name', self.workspace_name,
-                   '--resource-group', self.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0 and result.stdout.strip():
-                return json.loads(result.stdout)
-            else:
-                raise RuntimeError(f"Failed to get workspace info: {result.stderr}")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to get workspace info: {str(e)}")
-            raise
-    
     def _discover_default_resources(self, workspace_info: Dict):
         """Discover default workspace resources"""
         # Storage account
@@ -138,106 +178,83 @@ class ResourceDiscovery(BaseAnalyzer):
                 connection_type='default'
             )
     
-    def _discover_associated_resources(self, workspace_info: Dict):
+    def _list_workspace_items(self, kind: str) -> List[Dict]:
+        """List workspace items of a kind (compute, datastore, connection) via az ml"""
+        cmd = [AZ, 'ml', kind, 'list',
+               '--workspace-name', self.workspace_name,
+               '--resource-group', self.resource_group,
+               '--query', _LISTING_QUERIES[kind],
+               '--output', 'json']
+        
+        if self.subscription_id:
+            cmd.extend(['--subscription', self.subscription_id])
+            
+        return run_az_json(cmd, timeout=60) or []
+    
+    def _discover_associated_resources(self, workspace_info: Dict, listings: Dict[str, Future]):
         """Discover associated resources (compute, datastores, etc.)"""
         # Discover compute resources
-        self._discover_compute_resources()
+        self._discover_compute_resources(listings['compute'])
         
         # Discover datastores
-        self._discover_datastores()
+        self._discover_datastores(listings['datastore'])
         
         # Discover linked services (for AI Foundry)
         if self.hub_type == 'azure-ai-foundry':
             self._discover_linked_services()
     
-    def _discover_compute_resources(self):
+    def _discover_compute_resources(self, listing: Future):
         """Discover compute resources"""
         try:
-            cmd = ['az', 'ml', 'compute', 'list',
-                   '--workspace-name', self.workspace_name,
-                   '--resource-group', self.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                computes = json.loads(result.stdout)
+            for compute in listing.result():
+                compute_type = compute.get('type', '').lower()
                 
-                for compute in computes:
-                    compute_type = compute.get('type', '').lower()
+                # Handle different compute types
+                if compute_type == 'computeinstance':
+                    self._add_compute_instance(compute)
+                elif compute_type == 'amlcompute':
+                    self._add_compute_cluster(compute)
+                elif compute_type == 'kubernetes':
+                    self._add_kubernetes_compute(compute)
                     
-                    # Handle different compute types
-                    if compute_type == 'computeinstance':
-                        self._add_compute_instance(compute)
-                    elif compute_type == 'amlcompute':
-                        self._add_compute_cluster(compute)
-                    elif compute_type == 'kubernetes':
-                        self._add_kubernetes_compute(compute)
-                        
         except Exception as e:
             self.logger.warning(f"Failed to discover compute resources: {str(e)}")
     
-    def _discover_datastores(self):
+    def _discover_datastores(self, listing: Future):
         """Discover connected datastores"""
         try:
-            cmd = ['az', 'ml', 'datastore', 'list',
-                   '--workspace-name', self.workspace_name,
-                   '--resource-group', self.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                datastores = json.loads(result.stdout)
+            for datastore in listing.result():
+                datastore_type = datastore.get('type', '').lower()
                 
-                for datastore in datastores:
-                    datastore_type = datastore.get('type', '').lower()
-                    
-                    if datastore_type == 'azure_blob':
-                        account_name = datastore.get('account_name')
-                        if account_name:
-                            # Construct storage account resource ID
-                            resource_id = f"/subscriptions/{self.subscription_id or 'unknown'}/resourceGroups/*/providers/Microsoft.Storage/storageAccounts/{account_name}"
-                            self._add_resource(
-                                resource_id=resource_id,
-                                resource_type='Microsoft.Storage/storageAccounts',
-                                connection_type='user-defined'
-                            )
-                            
+                if datastore_type == 'azure_blob':
+                    account_name = datastore.get('account_name')
+                    if account_name:
+                        # Construct storage account resource ID
+                        resource_id = f"/subscriptions/{self.subscription_id or 'unknown'}/resourceGroups/*/providers/Microsoft.Storage/storageAccounts/{account_name}"
+                        self._add_resource(
+                            resource_id=resource_id,
+                            resource_type='Microsoft.Storage/storageAccounts',
+                            connection_type='user-defined'
+                        )
+                        
         except Exception as e:
             self.logger.warning(f"Failed to discover datastores: {str(e)}")
     
-    def _discover_user_connections(self):
+    def _discover_user_connections(self, listing: Future):
         """Discover user-defined connections (AI Foundry specific)"""
         try:
             # Use AI Foundry specific API
-            cmd = ['az', 'ml', 'connection', 'list',
-                   '--workspace-name', self.workspace_name,
-                   '--resource-group', self.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
+            for conn in listing.result():
+                conn_type = conn.get('type', '').lower()
                 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0:
-                connections = json.loads(result.stdout)
-                
-                for conn in connections:
-                    conn_type = conn.get('type', '').lower()
+                # Handle different connection types
+                if conn_type == 'azure_openai':
+                    self._add_azure_openai_connection(conn)
+                elif conn_type == 'cognitive_services':
+                    self._add_cognitive_services_connection(conn)
+                elif conn_type == 'custom':
+                    self._add_custom_connection(conn)
                     
-                    # Handle different connection types
-                    if conn_type == 'azure_openai':
-                        self._add_azure_openai_connection(conn)
-                    elif conn_type == 'cognitive_services':
-                        self._add_cognitive_services_connection(conn)
-                    elif conn_type == 'custom':
-                        self._add_custom_connection(conn)
-                        
         except Exception as e:
             self.logger.warning(f"Failed to discover user connections: {str(e)}")
     
@@ -260,11 +277,16 @@ class ResourceDiscovery(BaseAnalyzer):
                 name=parts[-1],
                 resource_group=parts[4] if len(parts) > 4 else self.resource_group,
                 connection_type=connection_type,
-                access_method='unknown'
+                access_method='unknown',
+                short_type=resource_type.rsplit('/', 1)[-1]
             )
             
             # Avoid duplicates
-            if not any(r.resource_id == resource_id for r in self.connected_resources):
+            key = resource_id.lower()
+            with self._resources_lock:
+                if key in self._resource_ids:
+                    return
+                self._resource_ids.add(key)
                 self.connected_resources.append(resource)
     
     def _add_compute_instance(self, compute: Dict):
@@ -275,7 +297,7 @@ class ResourceDiscovery(BaseAnalyzer):
         subnet = properties.get('properties', {}).get('subnet', {})
         if subnet.get('id'):
             # Add the VNet as a connected resource
-            vnet_id = '/'.join(subnet['id'].split('/')[:-2])
+            vnet_id = subnet['id'].rsplit('/', 2)[0]
             self._add_resource(
                 resource_id=vnet_id,
                 resource_type='Microsoft.Network/virtualNetworks',
@@ -289,7 +311,7 @@ class ResourceDiscovery(BaseAnalyzer):
         # Similar to compute instance
         subnet = properties.get('properties', {}).get('subnet', {})
         if subnet.get('id'):
-            vnet_id = '/'.join(subnet['id'].split('/')[:-2])
+            vnet_id = subnet['id'].rsplit('/', 2)[0]
             self._add_resource(
                 resource_id=vnet_id,
                 resource_type='Microsoft.Network/virtualNetworks',
@@ -314,10 +336,8 @@ class ResourceDiscovery(BaseAnalyzer):
         target = conn.get('target')
         if target:
             # Extract service name from endpoint
-            if '://' in target:
-                domain = target.split('://')[1].split('/')[0]
-                service_name = domain.split('.')[0]
-                
+            service_name = self._service_name_from_endpoint(target)
+            if service_name is not None:
                 resource_id = f"/subscriptions/{self.subscription_id or 'unknown'}/resourceGroups/*/providers/Microsoft.CognitiveServices/accounts/{service_name}"
                 self._add_resource(
                     resource_id=resource_id,
@@ -330,10 +350,8 @@ class ResourceDiscovery(BaseAnalyzer):
         target = conn.get('target')
         if target:
             # Similar to Azure OpenAI
-            if '://' in target:
-                domain = target.split('://')[1].split('/')[0]
-                service_name = domain.split('.')[0]
-                
+            service_name = self._service_name_from_endpoint(target)
+            if service_name is not None:
                 resource_id = f"/subscriptions/{self.subscription_id or 'unknown'}/resourceGroups/*/providers/Microsoft.CognitiveServices/accounts/{service_name}"
                 self._add_resource(
                     resource_id=resource_id,
@@ -341,199 +359,157 @@ class ResourceDiscovery(BaseAnalyzer):
                     connection_type='user-defined'
                 )
     
+    @staticmethod
+    def _service_name_from_endpoint(target: str) -> Optional[str]:
+        """First label of an endpoint URL's host, e.g. 'myaoai' for https://myaoai.openai.azure.com/"""
+        sep = target.find('://')
+        if sep < 0:
+            return None
+        host_start = sep + 3
+        host_end = target.find('/', host_start)
+        host = target[host_start:host_end] if host_end >= 0 else target[host_start:]
+        return host.partition('.')[0]
+    
     def _add_custom_connection(self, conn: Dict):
         """Add custom connection"""
         # Custom connections may point to various Azure services
         # This is a placeholder for custom connection analysis
         pass
     
-    def _analyze_resource(self, resource: ConnectedResource):
-        """Analyze a specific resource for connectivity details"""
-        analyzers = {
-            'Microsoft.Storage/storageAccounts': self._analyze_storage_account,
-            'Microsoft.KeyVault/vaults': self._analyze_key_vault,
-            'Microsoft.ContainerRegistry/registries': self._analyze_container_registry,
-            'Microsoft.CognitiveServices/accounts': self._analyze_cognitive_services
-        }
+    def _bulk_fetch_resource_details(self):
+        """Fetch ARM properties for all analyzable resources with one Resource Graph query"""
+        self._resource_details = {}
+        resource_ids = [
+            r.resource_id for r in self.connected_resources
+            if r.resource_type in _ANALYZED_TYPES and '*' not in r.resource_id
+        ]
+        if not resource_ids:
+            return
         
-        analyzer = analyzers.get(resource.resource_type)
-        if analyzer:
-            analyzer(resource)
-    
-    def _analyze_storage_account(self, resource: ConnectedResource):
-        """Analyze storage account connectivity"""
         try:
-            # Get storage account details
-            cmd = ['az', 'storage', 'account', 'show',
-                   '--name', resource.name,
-                   '--resource-group', resource.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                storage_info = json.loads(result.stdout)
-                
-                # Check public access
-                resource.public_access_enabled = (
-                    storage_info.get('publicNetworkAccess', 'Enabled') == 'Enabled'
-                )
-                
-                # Check private endpoints
-                private_endpoints = storage_info.get('privateEndpointConnections', [])
-                for pe in private_endpoints:
-                    resource.private_endpoints.append({
-                        'name': pe.get('name'),
-                        'state': pe.get('privateLinkServiceConnectionState', {}).get('status')
-                    })
-                
-                # Check firewall rules
-                network_acls = storage_info.get('networkAcls', {})
-                resource.network_acls = network_acls
-                
-                # Determine access method
-                if resource.private_endpoints:
-                    resource.access_method = 'private-endpoint'
-                elif not resource.public_access_enabled:
-                    resource.access_method = 'service-endpoint'
-                else:
-                    resource.access_method = 'public'
-                    
+            self._resource_details = graph_rows(resource_ids, self.subscription_id)
         except Exception as e:
-            self.logger.warning(f"Failed to analyze storage account {resource.name}: {str(e)}")
+            # Each resource falls back to its own az show
+            self.logger.warning(f"Failed to bulk fetch resource details: {str(e)}")
     
-    def _analyze_key_vault(self, resource: ConnectedResource):
-        """Analyze Key Vault connectivity"""
-        try:
-            cmd = ['az', 'keyvault', 'show',
-                   '--name', resource.name,
-                   '--output', 'json']
-            
+    def _needs_lookup(self, resource: ConnectedResource) -> bool:
+        """Whether analyzing the resource needs an ARM or az call beyond the bulk fetch"""
+        return (resource.resource_type in _ANALYZED_TYPES
+                and resource.resource_id.lower() not in self._resource_details)
+    
+    def _resource_info(self, resource: ConnectedResource, spec: Dict) -> Optional[Dict]:
+        """ARM details for a resource from the bulk fetch, an ARM GET, or its own az show command
+        
+        Returned with 'properties' lifted to the top level whichever source answered.
+        """
+        row = self._resource_details.get(resource.resource_id.lower())
+        # Ids built from a datastore or connection name have a '*' resource group
+        # (and maybe an 'unknown' subscription) that ARM cannot resolve
+        if (row is None and not self.use_cli and resource.resource_id.startswith('/subscriptions/')
+                and '*' not in resource.resource_id):
+            # Pooled, token-cached HTTPS session instead of a fresh az process
+            _, _, subscription, path = resource.resource_id.split('/', 3)
+            row = arm_get(path, subscription, spec['api_version'])
+        
+        if row is None:
+            cmd = [AZ, *spec['cmd'], '--name', resource.name]
+            if spec['by_resource_group']:
+                cmd.extend(['--resource-group', resource.resource_group])
+            cmd.extend(['--output', 'json'])
             if self.subscription_id:
                 cmd.extend(['--subscription', self.subscription_id])
                 
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                kv_info = json.loads(result.stdout)
-                
-                # Check public access
-                resource.public_access_enabled = (
-                    kv_info.get('properties', {}).get('publicNetworkAccess', 'Enabled') == 'Enabled'
-                )
-                
-                # Check private endpoints
-                private_endpoints = kv_info.get('properties', {}).get('privateEndpointConnections', [])
-                for pe in private_endpoints:
-                    resource.private_endpoints.append({
-                        'name': pe.get('name'),
-                        'state': pe.get('properties', {}).get('privateLinkServiceConnectionState', {}).get('status')
-                    })
-                
-                # Get network ACLs
-                cmd_network = ['az', 'keyvault', 'network-rule', 'list',
-                              '--name', resource.name,
-                              '--output', 'json']
-                
-                if self.subscription_id:
-                    cmd_network.extend(['--subscription', self.subscription_id])
-                    
-                result_network = subprocess.run(cmd_network, capture_output=True, text=True, timeout=30)
-                if result_network.returncode == 0 and result_network.stdout.strip():
-                    resource.network_acls = json.loads(result_network.stdout)
-                    
-                # Determine access method
-                if resource.private_endpoints:
-                    resource.access_method = 'private-endpoint'
-                elif not resource.public_access_enabled:
-                    resource.access_method = 'service-endpoint'
-                else:
-                    resource.access_method = 'public'
-                    
-        except Exception as e:
-            self.logger.warning(f"Failed to analyze key vault {resource.name}: {str(e)}")
+            try:
+                row = cached_az_json(cmd)
+            except RuntimeError:
+                return None
+        
+        return flatten_properties(row, ('privateEndpointConnections',)) if row is not None else None
     
-    def _analyze_container_registry(self, resource: ConnectedResource):
-        """Analyze Container Registry connectivity"""
+    def _analyze_resource(self, resource: ConnectedResource):
+        """Analyze a specific resource for connectivity details"""
+        spec = _ANALYZER_SPECS.get(resource.resource_type)
+        if spec:
+            self._analyze_arm_resource(resource, spec)
+        
+        # Access settings are final now; reports and the summary read the stored score
+        resource.security_score = resource.get_security_score()
+    
+    def _analyze_arm_resource(self, resource: ConnectedResource, spec: Dict):
+        """Analyze public access, private endpoints and network ACLs of one resource"""
         try:
-            cmd = ['az', 'acr', 'show',
-                   '--name', resource.name,
-                   '--resource-group', resource.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                acr_info = json.loads(result.stdout)
+            info = self._resource_info(resource, spec)
+            if info is not None:
                 
                 # Check public access
                 resource.public_access_enabled = (
-                    acr_info.get('publicNetworkAccess', 'Enabled') == 'Enabled'
+                    info.get('publicNetworkAccess', 'Enabled') == 'Enabled'
                 )
                 
                 # Check private endpoints
-                private_endpoints = acr_info.get('privateEndpointConnections', [])
-                for pe in private_endpoints:
-                    resource.private_endpoints.append({
-                        'name': pe.get('name'),
-                        'state': pe.get('privateLinkServiceConnectionState', {}).get('status')
-                    })
-                
-                # Determine access method
-                if resource.private_endpoints:
-                    resource.access_method = 'private-endpoint'
-                elif not resource.public_access_enabled:
-                    resource.access_method = 'service-endpoint'
-                else:
-                    resource.access_method = 'public'
-                    
-        except Exception as e:
-            self.logger.warning(f"Failed to analyze container registry {resource.name}: {str(e)}")
-    
-    def _analyze_cognitive_services(self, resource: ConnectedResource):
-        """Analyze Cognitive Services connectivity"""
-        try:
-            cmd = ['az', 'cognitiveservices', 'account', 'show',
-                   '--name', resource.name,
-                   '--resource-group', resource.resource_group,
-                   '--output', 'json']
-            
-            if self.subscription_id:
-                cmd.extend(['--subscription', self.subscription_id])
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0 and result.stdout.strip():
-                cs_info = json.loads(result.stdout)
-                
-                # Check public access
-                resource.public_access_enabled = (
-                    cs_info.get('properties', {}).get('publicNetworkAccess', 'Enabled') == 'Enabled'
+                resource.private_endpoints.extend(
+                    self._extract_private_endpoints(info.get('privateEndpointConnections', []))
                 )
                 
-                # Check private endpoints
-                private_endpoints = cs_info.get('properties', {}).get('privateEndpointConnections', [])
-                for pe in private_endpoints:
-                    resource.private_endpoints.append({
-                        'name': pe.get('name'),
-                        'state': pe.get('properties', {}).get('privateLinkServiceConnectionState', {}).get('status')
-                    })
+                # Check firewall rules
+                if spec['network_acls'] == 'full':
+                    resource.network_acls = info.get('networkAcls', {})
+                elif spec['network_acls'] == 'rules':
+                    self._key_vault_network_acls(resource, info.get('networkAcls'))
                 
-                # Determine access method
-                if resource.private_endpoints:
-                    resource.access_method = 'private-endpoint'
-                elif not resource.public_access_enabled:
-                    resource.access_method = 'service-endpoint'
-                else:
-                    resource.access_method = 'public'
+                self._finalize_access_method(resource)
                     
         except Exception as e:
-            self.logger.warning(f"Failed to analyze cognitive services {resource.name}: {str(e)}")
+            self.logger.warning(f"Failed to analyze {spec['label']} {resource.name}: {str(e)}")
+    
+    @staticmethod
+    def _extract_private_endpoints(pe_list: Optional[List[Dict]]) -> List[Dict]:
+        """Name and connection state of each private endpoint connection"""
+        return [
+            {'name': pe.get('name'), 'state': pe.get('privateLinkServiceConnectionState', {}).get('status')}
+            for pe in pe_list or ()
+        ]
+    
+    @staticmethod
+    def _finalize_access_method(resource: ConnectedResource):
+        """Determine access method from the resource's private endpoints and public access"""
+        if resource.private_endpoints:
+            resource.access_method = 'private-endpoint'
+        elif not resource.public_access_enabled:
+            resource.access_method = 'service-endpoint'
+        else:
+            resource.access_method = 'public'
+    
+    def _key_vault_network_acls(self, resource: ConnectedResource, network_acls: Optional[Dict]):
+        """Record a vault's IP and VNet rules, listing them via az when ARM omitted them"""
+        if network_acls is not None:
+            resource.network_acls = {
+                'ipRules': network_acls.get('ipRules', []),
+                'virtualNetworkRules': network_acls.get('virtualNetworkRules', [])
+            }
+            return
+        
+        cmd_network = [AZ, 'keyvault', 'network-rule', 'list',
+                       '--name', resource.name,
+                       '--output', 'json']
+        
+        if self.subscription_id:
+            cmd_network.extend(['--subscription', self.subscription_id])
+            
+        try:
+            network_rules = cached_az_json(cmd_network)
+            if network_rules is not None:
+                resource.network_acls = network_rules
+        except RuntimeError:
+            pass
     
     def _build_dependency_graph(self):
         """Build resource dependency graph"""
+        # Resource ids by type, so dependency lookups don't rescan the resource list
+        by_type: Dict[str, List[str]] = {}
+        for resource in self.connected_resources:
+            by_type.setdefault(resource.resource_type, []).append(resource.resource_id)
+        
         # This creates a graph showing which resources depend on others
         for resource in self.connected_resources:
             self.resource_graph[resource.resource_id] = []
@@ -541,32 +517,28 @@ class ResourceDiscovery(BaseAnalyzer):
             # Add dependencies based on resource type
             if resource.resource_type == 'Microsoft.MachineLearningServices/workspaces/computes':
                 # Compute depends on VNet, Storage
-                storage_resources = [r.resource_id for r in self.connected_resources 
-                                   if r.resource_type == 'Microsoft.Storage/storageAccounts']
-                self.resource_graph[resource.resource_id].extend(storage_resources)
+                self.resource_graph[resource.resource_id].extend(
+                    by_type.get('Microsoft.Storage/storageAccounts', ())
+                )
     
     def _format_discovery_results(self) -> Dict:
         """Format discovery results for output"""
-        resources_by_type = {}
+        resources_by_type: Dict[str, List[Dict]] = defaultdict(list)
         
         for resource in self.connected_resources:
-            resource_type = resource.resource_type.split('/')[-1]
-            if resource_type not in resources_by_type:
-                resources_by_type[resource_type] = []
-                
-            resources_by_type[resource_type].append({
+            resources_by_type[resource.short_type].append({
                 'name': resource.name,
                 'resource_group': resource.resource_group,
                 'connection_type': resource.connection_type,
                 'access_method': resource.access_method,
                 'public_access': resource.public_access_enabled,
-                'security_score': resource.get_security_score(),
+                'security_score': resource.security_score,
                 'private_endpoints': len(resource.private_endpoints)
             })
         
         return {
             'total_resources': len(self.connected_resources),
-            'resources_by_type': resources_by_type,
+            'resources_by_type': dict(resources_by_type),
             'security_summary': self._generate_security_summary(),
             'dependency_graph': self.resource_graph
         }
@@ -574,36 +546,49 @@ class ResourceDiscovery(BaseAnalyzer):
     def _generate_security_summary(self) -> Dict:
         """Generate security summary for all resources"""
         total_resources = len(self.connected_resources)
-        public_accessible = sum(1 for r in self.connected_resources if r.public_access_enabled)
-        private_endpoint_protected = sum(1 for r in self.connected_resources if r.private_endpoints)
+        public_accessible = private_endpoint_protected = default_without_pe = score_sum = 0
+        type_scores: Dict[str, List[int]] = defaultdict(list)
+        
+        # One pass over the resources for every count the summary needs
+        for r in self.connected_resources:
+            if r.public_access_enabled:
+                public_accessible += 1
+            if r.private_endpoints:
+                private_endpoint_protected += 1
+            elif r.connection_type == 'default':
+                default_without_pe += 1
+            score_sum += r.security_score
+            type_scores[r.short_type].append(r.security_score)
         
-        avg_security_score = sum(r.get_security_score() for r in self.connected_resources) / total_resources if total_resources > 0 else 0
+        avg_security_score = score_sum / total_resources if total_resources > 0 else 0
         
         return {
             'total_resources': total_resources,
             'public_accessible': public_accessible,
             'private_endpoint_protected': private_endpoint_protected,
             'average_security_score': round(avg_security_score, 1),
-            'recommendations': self._generate_resource_recommendations()
+            # Keyed like resources_by_type, so summaries need not rescan the resources
+            'average_security_score_by_type': {
+                short_type: sum(scores) / len(scores) for short_type, scores in type_scores.items()
+            },
+            'recommendations': self._generate_resource_recommendations(public_accessible, default_without_pe)
         }
     
-    def _generate_resource_recommendations(self) -> List[str]:
-        """Generate recommendations for connected resources"""
+    def _generate_resource_recommendations(self, public_accessible: int,
+                                           default_without_pe: int) -> List[str]:
+        """Generate recommendations from the security summary counts"""
         recommendations = []
         
         # Check for public access
-        public_resources = [r for r in self.connected_resources if r.public_access_enabled]
-        if public_resources:
+        if public_accessible:
             recommendations.append(
-                f"Consider disabling public access for {len(public_resources)} resources"
+                f"Consider disabling public access for {public_accessible} resources"
             )
         
         # Check for missing private endpoints
-        no_pe_resources = [r for r in self.connected_resources 
-                          if not r.private_endpoints and r.connection_type == 'default']
-        if no_pe_resources:
+        if default_without_pe:
             recommendations.append(
-                f"Consider adding private endpoints to {len(no_pe_resources)} default resources"
+                f"Consider adding private endpoints to {default_without_pe} default resources"
             )
         
         return recommendations 
\ No newline at end of file
@@ -1,136 +1,233 @@
-from typing import Dict, List, Optional
-import os
+from typing import Any, Callable, Dict, List
+from collections import Counter
+from itertools import chain, islice
+import functools
 from .report_formatter import ReportFormatter
 
+# Section rules, built once at import
+_SEP80 = "=" * 80
+_SEP50 = "=" * 50
+
+# Static banners of each summary
+_CLI_HEADER = f"\n{_SEP80}\n📊 CONNECTIVITY ANALYSIS SUMMARY\n{_SEP80}\n\n"
+_CLI_FOOTER = f"\n{_SEP80}\n"
+_SEC_HEADER = f"\n🛡️  SECURITY ANALYSIS SUMMARY\n{_SEP50}\n\n"
+_RES_HEADER = f"\n🔗 RESOURCE CONNECTIVITY SUMMARY\n{_SEP50}\n\n"
+_SECTION_FOOTER = f"\n{_SEP50}\n"
+_NO_RESOURCES = f"No connected resources found.\n{_SEP50}\n"
+
+# CLI and security summary lines, indexed by whether public network access is enabled
+_CLI_PUBLIC_ACCESS_LINES = (
+    "   Public Access: ✅ Disabled\n",
+    "   Public Access: ⚠️ Enabled\n"
+)
+_PUBLIC_ACCESS_LINES = (
+    "   ✅ Private network access only\n",
+    "   ⚠️  Public network access enabled\n"
+)
+
+# Security summary lines for the well-known managed network isolation modes
+_ISOLATION_LINES = {
+    'allow_only_approved_outbound': "   ✅ Strict outbound control enabled\n",
+    'allow_internet_outbound': "   ⚠️  Internet outbound allowed\n"
+}
+
+def _render(emit: Callable[[Callable[[str], Any]], None]) -> str:
+    """Join the fragments an _emit_* method passes to its write callable"""
+    parts: List[str] = []
+    emit(parts.append)
+    return "".join(parts)
+
+def _emit_average_score(write: Callable[[str], Any], label: str, security_summary: Dict,
+                        fmt_score: Callable[[int], str]):
+    """Write the average security score line every summary shows"""
+    write(f"{label}{fmt_score(int(security_summary.get('average_security_score', 0)))}\n")
+
+# Summary text for analyses that produced no results, rendered once per process
+_NO_RESULTS_TEXT: Dict[str, str] = {}
+
+def _memoized(method):
+    """Cache a summary's text on the instance; analysis_results is fixed once constructed"""
+    @functools.wraps(method)
+    def wrapper(self) -> str:
+        text = self._cache.get(method.__name__)
+        if text is None:
+            text = self._cache[method.__name__] = method(self)
+        return text
+    return wrapper
+
+def _static_without_results(method):
+    """Render a summary that only reads analysis_results['results'] once for all empty results"""
+    @functools.wraps(method)
+    def wrapper(self) -> str:
+        if self.analysis_results.get('results'):
+            return method(self)
+        text = _NO_RESULTS_TEXT.get(method.__name__)
+        if text is None:
+            text = _NO_RESULTS_TEXT[method.__name__] = method(self)
+        return text
+    return wrapper
+
 class SummaryReportGenerator:
     """Generates concise summary reports"""
     
     def __init__(self, analysis_results: Dict):
         self.analysis_results = analysis_results
         self.formatter = ReportFormatter()
+        # Method name -> generated summary text
+        self._cache: Dict[str, str] = {}
     
+    @_memoized
     def generate_cli_summary(self) -> str:
         """Generate summary for CLI output"""
-        workspace_info = self.analysis_results.get('results', {}).get('workspace', {})
-        network_info = self.analysis_results.get('results', {}).get('network', {})
-        resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
-        summary_info = self.analysis_results.get('summary', {})
+        return _render(self._emit_cli)
+    
+    def _emit_cli(self, write: Callable[[str], Any]):
+        """Pass the CLI summary to write one fragment at a time"""
+        results = self.analysis_results.get('results')
+        if results:
+            self._emit_cli_results(write, results)
+        else:
+            # Early failures leave no results; that part of the summary never varies
+            text = _NO_RESULTS_TEXT.get('_emit_cli_results')
+            if text is None:
+                text = _NO_RESULTS_TEXT['_emit_cli_results'] = _render(
+                    lambda write_empty: self._emit_cli_results(write_empty, {})
+                )
+            write(text)
+        self._emit_cli_analysis(write)
+    
+    def _emit_cli_results(self, write: Callable[[str], Any], results: Dict):
+        """Write the CLI summary header, workspace, network, resource and recommendation sections"""
+        workspace_info = results.get('workspace') or {}
+        network_info = results.get('network') or {}
+        resources_info = results.get('connected_resources') or {}
+        fmt_count = self.formatter.format_resource_count
+        fmt_score = self.formatter.format_security_score
+        
+        # Values used more than once below
+        endpoint_count = (network_info.get('private_endpoints') or {}).get('count', 0)
+        outbound_count = (network_info.get('outbound_rules') or {}).get('count', 0)
+        security_summary = resources_info.get('security_summary') or {}
+        total_count = security_summary.get('total_resources', 0)
         
-        output = "\n" + "=" * 80 + "\n"
-        output += "📊 CONNECTIVITY ANALYSIS SUMMARY\n"
-        output += "=" * 80 + "\n\n"
+        write(_CLI_HEADER)
         
         # Workspace info
-        output += f"📍 Workspace: {workspace_info.get('name', 'Unknown')}\n"
-        output += f"   Type: {workspace_info.get('hub_type', 'Unknown').replace('-', ' ').title()}\n"
-        output += f"   Location: {workspace_info.get('location', 'Unknown')}\n\n"
+        write(f"📍 Workspace: {workspace_info.get('name', 'Unknown')}\n")
+        write(f"   Type: {workspace_info.get('hub_type', 'Unknown').replace('-', ' ').title()}\n")
+        write(f"   Location: {workspace_info.get('location', 'Unknown')}\n\n")
         
         # Network summary
-        output += "🌐 Network Configuration:\n"
-        output += f"   Type: {network_info.get('network_type', 'Unknown')}\n"
-        output += f"   Public Access: {'⚠️ Enabled' if network_info.get('public_network_access') else '✅ Disabled'}\n"
+        write("🌐 Network Configuration:\n")
+        write(f"   Type: {network_info.get('network_type', 'Unknown')}\n")
+        write(_CLI_PUBLIC_ACCESS_LINES[bool(network_info.get('public_network_access'))])
         
-        if network_info.get('private_endpoints', {}).get('count', 0) > 0:
-            output += f"   Private Endpoints: {network_info.get('private_endpoints', {}).get('count', 0)}\n"
+        if endpoint_count > 0:
+            write(f"   Private Endpoints: {endpoint_count}\n")
         
-        if network_info.get('outbound_rules', {}).get('count', 0) > 0:
-            output += f"   Outbound Rules: {network_info.get('outbound_rules', {}).get('count', 0)}\n"
+        if outbound_count > 0:
+            write(f"   Outbound Rules: {outbound_count}\n")
         
-        output += "\n"
+        write("\n")
         
         # Resources summary
-        output += "🔗 Connected Resources:\n"
-        output += f"   Total: {resources_info.get('total_resources', 0)}\n"
-        
-        security_summary = resources_info.get('security_summary', {})
-        output += f"   Average Security Score: {self.formatter.format_security_score(int(security_summary.get('average_security_score', 0)))}\n"
+        write("🔗 Connected Resources:\n")
+        write(f"   Total: {resources_info.get('total_resources', 0)}\n")
+        _emit_average_score(write, "   Average Security Score: ", security_summary, fmt_score)
         
         public_count = security_summary.get('public_accessible', 0)
-        total_count = security_summary.get('total_resources', 0)
-        output += f"   Public Accessible: {self.formatter.format_resource_count(public_count, total_count)}\n"
+        write(f"   Public Accessible: {fmt_count(public_count, total_count)}\n")
         
         pe_count = security_summary.get('private_endpoint_protected', 0)
-        output += f"   Private Endpoint Protected: {self.formatter.format_resource_count(pe_count, total_count)}\n\n"
+        write(f"   Private Endpoint Protected: {fmt_count(pe_count, total_count)}\n\n")
         
         # Resource breakdown by type
         resources_by_type = resources_info.get('resources_by_type', {})
         if resources_by_type:
-            output += "📦 Resources by Type:\n"
+            # Resource discovery precomputes the per-type averages; older results lack them
+            type_averages = security_summary.get('average_security_score_by_type') or {}
+            write("📦 Resources by Type:\n")
             for resource_type, resources in resources_by_type.items():
-                avg_score = sum(r.get('security_score', 0) for r in resources) / len(resources) if resources else 0
-                output += f"   {resource_type}: {len(resources)} (avg score: {avg_score:.1f}/100)\n"
-            output += "\n"
-        
-        # Key recommendations
-        all_recommendations = []
-        if 'recommendations' in network_info:
-            all_recommendations.extend(network_info['recommendations'])
-        if 'recommendations' in security_summary:
-            all_recommendations.extend(security_summary['recommendations'])
-        
-        if all_recommendations:
-            output += "⚡ Key Recommendations:\n"
-            for rec in all_recommendations[:3]:  # Show top 3
-                output += f"   • {rec}\n"
-            if len(all_recommendations) > 3:
-                output += f"   ... and {len(all_recommendations) - 3} more recommendations\n"
-            output += "\n"
+                count = len(resources)
+                avg_score = type_averages.get(resource_type)
+                if avg_score is None:
+                    avg_score = sum(r.get('security_score', 0) for r in resources) / count if count else 0
+                write(f"   {resource_type}: {count} (avg score: {avg_score:.1f}/100)\n")
+            write("\n")
+        
+        # Key recommendations, network first; only the top 3 are printed
+        network_recs = network_info.get('recommendations') or ()
+        security_recs = security_summary.get('recommendations') or ()
+        total_recs = len(network_recs) + len(security_recs)
+        
+        if total_recs:
+            write("⚡ Key Recommendations:\n")
+            for rec in islice(chain(network_recs, security_recs), 3):  # Show top 3
+                write(f"   • {rec}\n")
+            if total_recs > 3:
+                write(f"   ... and {total_recs - 3} more recommendations\n")
+            write("\n")
+    
+    def _emit_cli_analysis(self, write: Callable[[str], Any]):
+        """Write the CLI summary's analysis run details and footer"""
+        summary_info = self.analysis_results.get('summary') or {}
+        fmt_duration = self.formatter.format_duration
         
         # Analysis summary
-        analysis_summary = summary_info.get('summary', {})
-        output += "✅ Analysis Complete:\n"
+        analysis_summary = summary_info.get('summary') or {}
+        write("✅ Analysis Complete:\n")
         
         duration = analysis_summary.get('total_duration', 0)
-        output += f"   Duration: {self.formatter.format_duration(duration)}\n"
+        write(f"   Duration: {fmt_duration(duration)}\n")
         
         successful_steps = analysis_summary.get('successful_steps', 0)
         total_steps = analysis_summary.get('total_steps', 0)
-        output += f"   Steps Completed: {successful_steps}/{total_steps}\n"
+        write(f"   Steps Completed: {successful_steps}/{total_steps}\n")
         
-        if analysis_summary.get('failed_steps', 0) > 0:
-            output += f"   Failed Steps: {analysis_summary.get('failed_steps', 0)}\n"
+        failed_steps = analysis_summary.get('failed_steps', 0)
+        if failed_steps > 0:
+            write(f"   Failed Steps: {failed_steps}\n")
         
-        if 'report_location' in self.analysis_results:
-            output += f"\n📄 Full report saved to: {self.analysis_results['report_location']}\n"
-            json_path = self.analysis_results['report_location'].replace('.md', '.json')
-            output += f"   JSON data saved to: {json_path}\n"
+        report_location = self.analysis_results.get('report_location')
+        if report_location is not None:
+            write(f"\n📄 Full report saved to: {report_location}\n")
+            # Swap only the suffix; '.md' may also appear earlier in the path
+            json_path = (report_location[:-3] if report_location.endswith('.md') else report_location) + '.json'
+            write(f"   JSON data saved to: {json_path}\n")
         
-        output += "\n" + "=" * 80 + "\n"
-        
-        return output
+        write(_CLI_FOOTER)
     
+    @_memoized
+    @_static_without_results
     def generate_security_summary(self) -> str:
         """Generate focused security summary"""
+        return _render(self._emit_security)
+    
+    def _emit_security(self, write: Callable[[str], Any]):
+        """Pass the security summary to write one fragment at a time"""
         network_info = self.analysis_results.get('results', {}).get('network', {})
         resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
         security_summary = resources_info.get('security_summary', {})
         
-        output = "\n" + "🛡️  SECURITY ANALYSIS SUMMARY\n"
-        output += "=" * 50 + "\n\n"
+        write(_SEC_HEADER)
         
         # Overall security posture
-        avg_score = security_summary.get('average_security_score', 0)
-        output += f"Overall Security Score: {self.formatter.format_security_score(int(avg_score))}\n\n"
+        _emit_average_score(write, "Overall Security Score: ", security_summary,
+                            self.formatter.format_security_score)
+        write("\n")
         
         # Network security
-        output += "Network Security:\n"
-        if not network_info.get('public_network_access'):
-            output += "   ✅ Private network access only\n"
-        else:
-            output += "   ⚠️  Public network access enabled\n"
+        write("Network Security:\n")
+        write(_PUBLIC_ACCESS_LINES[bool(network_info.get('public_network_access'))])
         
         isolation_mode = network_info.get('isolation_mode', 'Not configured')
-        if isolation_mode == 'allow_only_approved_outbound':
-            output += "   ✅ Strict outbound control enabled\n"
-        elif isolation_mode == 'allow_internet_outbound':
-            output += "   ⚠️  Internet outbound allowed\n"
-        else:
-            output += f"   ℹ️  Isolation mode: {isolation_mode}\n"
+        write(_ISOLATION_LINES.get(isolation_mode) or f"   ℹ️  Isolation mode: {isolation_mode}\n")
         
-        output += "\n"
+        write("\n")
         
         # Resource security
-        output += "Resource Security:\n"
+        write("Resource Security:\n")
         total_resources = security_summary.get('total_resources', 0)
         
         if total_resources > 0:
@@ -138,103 +235,106 @@ class SummaryReportGenerator:
             pe_protected = security_summary.get('private_endpoint_protected', 0)
             
             if public_accessible == 0:
-                output += "   ✅ No resources with public access\n"
+                write("   ✅ No resources with public access\n")
             else:
-                output += f"   ⚠️  {public_accessible} resources with public access\n"
+                write(f"   ⚠️  {public_accessible} resources with public access\n")
             
             if pe_protected > 0:
-                output += f"   ✅ {pe_protected} resources protected with private endpoints\n"
+                write(f"   ✅ {pe_protected} resources protected with private endpoints\n")
             else:
-                output += "   ⚠️  No private endpoint protection found\n"
+                write("   ⚠️  No private endpoint protection found\n")
         else:
-            output += "   ℹ️  No resources analyzed\n"
+            write("   ℹ️  No resources analyzed\n")
         
-        output += "\n"
+        write("\n")
         
         # Top security recommendations
         recommendations = security_summary.get('recommendations', [])
         if recommendations:
-            output += "Priority Actions:\n"
+            write("Priority Actions:\n")
             for idx, rec in enumerate(recommendations[:2], 1):
-                output += f"   {idx}. {rec}\n"
-        
-        output += "\n" + "=" * 50 + "\n"
+                write(f"   {idx}. {rec}\n")
         
-        return output
+        write(_SECTION_FOOTER)
+
     
+    @_memoized
+    @_static_without_results
     def generate_resource_summary(self) -> str:
         """Generate focused resource connectivity summary"""
+        return _render(self._emit_resources)
+    
+    def _emit_resources(self, write: Callable[[str], Any]):
+        """Pass the resource connectivity summary to write one fragment at a time"""
         resources_info = self.analysis_results.get('results', {}).get('connected_resources', {})
+        fmt_count = self.formatter.format_resource_count
+        fmt_score = self.formatter.format_security_score
+        fmt_conn = self.formatter.format_connection_type
         
-        output = "\n" + "🔗 RESOURCE CONNECTIVITY SUMMARY\n"
-        output += "=" * 50 + "\n\n"
+        write(_RES_HEADER)
         
         total_resources = resources_info.get('total_resources', 0)
-        output += f"Total Connected Resources: {total_resources}\n\n"
+        write(f"Total Connected Resources: {total_resources}\n\n")
         
         if total_resources == 0:
-            output += "No connected resources found.\n"
-            output += "=" * 50 + "\n"
-            return output
+            write(_NO_RESOURCES)
+            return
         
         # Resources by type
         resources_by_type = resources_info.get('resources_by_type', {})
         
         if resources_by_type:
-            output += "Resource Types:\n"
+            write("Resource Types:\n")
             for resource_type, resources in resources_by_type.items():
-                output += f"   {resource_type}: {len(resources)}\n"
-            output += "\n"
+                write(f"   {resource_type}: {len(resources)}\n")
+            write("\n")
         
-        # Access methods distribution
-        access_methods = {}
-        connection_types = {}
+        # Access method, connection type and security score distributions in one pass
+        access_methods: Counter = Counter()
+        connection_types: Counter = Counter()
+        high_security = medium_security = low_security = 0
         
-        for resource_type, resources in resources_by_type.items():
+        for resources in resources_by_type.values():
             for resource in resources:
-                access_method = resource.get('access_method', 'unknown')
-                access_methods[access_method] = access_methods.get(access_method, 0) + 1
+                access_methods[resource.get('access_method', 'unknown')] += 1
+                connection_types[resource.get('connection_type', 'unknown')] += 1
                 
-                connection_type = resource.get('connection_type', 'unknown')
-                connection_types[connection_type] = connection_types.get(connection_type, 0) + 1
+                score = resource.get('security_score', 0)
+                if score >= 80:
+                    high_security += 1
+                elif score >= 60:
+                    medium_security += 1
+                else:
+                    low_security += 1
+        
+        # total_resources is non-zero past the early return above
+        pct_scale = 100.0 / total_resources
         
         if access_methods:
-            output += "Access Methods:\n"
+            write("Access Methods:\n")
             for method, count in access_methods.items():
-                percentage = (count / total_resources) * 100
-                output += f"   {self.formatter.format_connection_type(method)}: {count} ({percentage:.1f}%)\n"
-            output += "\n"
+                percentage = count * pct_scale
+                write(f"   {fmt_conn(method)}: {count} ({percentage:.1f}%)\n")
+            write("\n")
         
         if connection_types:
-            output += "Connection Types:\n"
+            write("Connection Types:\n")
             for conn_type, count in connection_types.items():
-                percentage = (count / total_resources) * 100
-                output += f"   {conn_type}: {count} ({percentage:.1f}%)\n"
-            output += "\n"
+                percentage = count * pct_scale
+                write(f"   {conn_type}: {count} ({percentage:.1f}%)\n")
+            write("\n")
         
         # Security insights
         security_summary = resources_info.get('security_summary', {})
-        avg_score = security_summary.get('average_security_score', 0)
         
-        output += f"Security Insights:\n"
-        output += f"   Average Score: {self.formatter.format_security_score(int(avg_score))}\n"
+        write(f"Security Insights:\n")
+        _emit_average_score(write, "   Average Score: ", security_summary, fmt_score)
         
         # Resource security distribution
         if resources_by_type:
-            high_security = sum(1 for resources in resources_by_type.values() 
-                              for resource in resources 
-                              if resource.get('security_score', 0) >= 80)
-            medium_security = sum(1 for resources in resources_by_type.values() 
-                                for resource in resources 
-                                if 60 <= resource.get('security_score', 0) < 80)
-            low_security = sum(1 for resources in resources_by_type.values() 
-                             for resource in resources 
-                             if resource.get('security_score', 0) < 60)
-            
-            output += f"   High Security (80+): {self.formatter.format_resource_count(high_security, total_resources)}\n"
-            output += f"   Medium Security (60-79): {self.formatter.format_resource_count(medium_security, total_resources)}\n"
-            output += f"   Low Security (<60): {self.formatter.format_resource_count(low_security, total_resources)}\n"
-        
-        output += "\n" + "=" * 50 + "\n"
+            write(f"   High Security (80+): {fmt_count(high_security, total_resources)}\n")
+            write(f"   Medium Security (60-79): {fmt_count(medium_security, total_resources)}\n")
+            write(f"   Low Security (<60): {fmt_count(low_security, total_resources)}\n")
         
-        return output 
\ No newline at end of file
+        write(_SECTION_FOOTER)
+ 
\ No newline at end of file
@@ -1,8 +1,30 @@
 from typing import Dict, List, Optional
-import json
-import subprocess
+from concurrent.futures import Executor, ThreadPoolExecutor
+import functools
 import logging
 
+from .azure_api import arm_get, flatten_properties, graph_rows, run_az_json
+
+# Network resource provider API version for direct ARM reads
+_NETWORK_API_VERSION = '2023-09-01'
+
+# Sub-resource lists whose entries ARM nests under their own 'properties' but az show flattens
+_NESTED_SUB_RESOURCES = ('securityRules', 'defaultSecurityRules', 'routes', 'subnets')
+
+# Concurrent az lookups per analysis; the work is all CLI round-trips
+_MAX_WORKERS = 16
+
+def _memoized(method):
+    """Cache a lookup on the instance per (subscription, resource ID), failures included"""
+    @functools.wraps(method)
+    def wrapper(self, resource_id: str) -> Optional[Dict]:
+        key = (method.__name__, self.subscription_id, resource_id.lower())
+        if key in self._cache:
+            return self._cache[key]
+        result = self._cache[key] = method(self, resource_id)
+        return result
+    return wrapper
+
 class VNetAnalyzer:
     """Analyzes Virtual Network configurations"""
     
@@ -10,6 +32,9 @@ class VNetAnalyzer:
         self.resource_group = resource_group
         self.subscription_id = subscription_id
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._cache = {}
+        # Lower-cased resource id -> Resource Graph row, see _bulk_fetch
+        self._graph_rows: Dict[str, Dict] = {}
         
     def analyze_workspace_vnet(self, workspace_info: Dict) -> Dict:
         """Analyze VNet associated with workspace"""
@@ -21,26 +46,49 @@ class VNetAnalyzer:
             'analysis_summary': {}
         }
         
+        # Start every analysis from fresh lookups
+        self._cache.clear()
+        self._graph_rows.clear()
+        
         try:
-            # Extract subnet information from private endpoints
-            subnet_ids = self._extract_subnet_ids(workspace_info)
-            
-            # Get VNet information for each subnet
-            for subnet_id in subnet_ids:
-                subnet_info = self._get_subnet_info(subnet_id)
-                if subnet_info:
-                    vnet_info['subnets'].append(subnet_info)
-                    
-                    # Get VNet details
-                    vnet_details = self._get_vnet_details(subnet_id)
-                    if vnet_details and not any(v['id'] == vnet_details['id'] for v in vnet_info['vnets']):
-                        vnet_info['vnets'].append(vnet_details)
-            
-            # Analyze network security groups
-            vnet_info['network_security_groups'] = self.analyze_network_security_groups(subnet_ids)
-            
-            # Analyze route tables
-            vnet_info['route_tables'] = self._analyze_route_tables(subnet_ids)
+            pe_count = len(workspace_info.get('private_endpoint_connections') or [])
+            with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, pe_count or 1)) as executor:
+                # Extract subnet information from private endpoints
+                subnet_ids = self._extract_subnet_ids(workspace_info, executor)
+                
+                # VNet rows carry their subnets, so one query covers both
+                self._bulk_fetch([subnet_id.rsplit('/subnets/', 1)[0] for subnet_id in subnet_ids])
+                
+                # Get subnet information for all subnets at once
+                subnet_infos = dict(zip(subnet_ids, executor.map(self._get_subnet_info, subnet_ids)))
+                vnet_info['subnets'] = [info for info in subnet_infos.values() if info]
+                
+                # One pass collects each distinct VNet, NSG and route table across the subnets
+                vnet_subnets, nsg_ids, rt_ids = {}, {}, {}
+                for subnet_id, subnet_info in subnet_infos.items():
+                    if not subnet_info:
+                        continue
+                    vnet_subnets.setdefault(subnet_id.lower().rsplit('/subnets/', 1)[0], subnet_id)
+                    nsg_id = (subnet_info.get('network_security_group') or {}).get('id')
+                    if nsg_id:
+                        nsg_ids[nsg_id] = None
+                    rt_id = (subnet_info.get('route_table') or {}).get('id')
+                    if rt_id:
+                        rt_ids[rt_id] = None
+                
+                # Then all of their lookups run together
+                self._bulk_fetch([*nsg_ids, *rt_ids])
+                vnet_details = executor.map(self._get_vnet_details, vnet_subnets.values())
+                nsg_details = executor.map(self._get_nsg_details, nsg_ids)
+                rt_details = executor.map(self._get_route_table_details, rt_ids)
+                
+                vnet_info['network_security_groups'] = [nsg for nsg in nsg_details if nsg]
+                vnet_info['route_tables'] = [rt for rt in rt_details if rt]
+                seen_vnets = set()
+                for details in vnet_details:
+                    if details and details['id'] not in seen_vnets:
+                        seen_vnets.add(details['id'])
+                        vnet_info['vnets'].append(details)
             
             # Generate analysis summary
             vnet_info['analysis_summary'] = self._generate_vnet_summary(vnet_info)
@@ -54,32 +102,69 @@ class VNetAnalyzer:
             
         return vnet_info
     
-    def _extract_subnet_ids(self, workspace_info: Dict) -> List[str]:
+    def _bulk_fetch(self, resource_ids: List[str]):
+        """Fetch ARM properties for a batch of resources with one Resource Graph query
+        
+        Subnets are not listed by Resource Graph on their own, so they are taken from their VNet rows.
+        """
+        resource_ids = [rid for rid in dict.fromkeys(resource_ids) if rid.lower() not in self._graph_rows]
+        if not resource_ids:
+            return
+        
+        rows = graph_rows(resource_ids, self.subscription_id)
+        for row in rows.values():
+            resource = flatten_properties(row, _NESTED_SUB_RESOURCES)
+            self._graph_rows[resource.get('id', '').lower()] = resource
+            for subnet in resource.get('subnets') or []:
+                if subnet.get('id'):
+                    self._graph_rows[subnet['id'].lower()] = subnet
+    
+    def _arm_resource(self, resource_id: str) -> Optional[Dict]:
+        """ARM details for a resource from the bulk fetch or an ARM GET, shaped like az show output
+        
+        Returns None when neither has it, so the caller falls back to az.
+        """
+        resource = self._graph_rows.get(resource_id.lower())
+        if resource is not None:
+            return resource
+        if not resource_id.startswith('/subscriptions/'):
+            return None
+        _, _, subscription, path = resource_id.split('/', 3)
+        resource = arm_get(path, subscription, _NETWORK_API_VERSION)
+        return flatten_properties(resource, _NESTED_SUB_RESOURCES) if resource is not None else None
+    
+    def _extract_subnet_ids(self, workspace_info: Dict, executor: Optional[Executor] = None) -> List[str]:
         """Extract subnet IDs from workspace information"""
-        subnet_ids = set()
+        subnet_ids = {}
         
         # Extract from private endpoint connections
         pe_connections = workspace_info.get('private_endpoint_connections', [])
-        for pe_conn in pe_connections:
-            private_endpoint = pe_conn.get('private_endpoint', {})
-            pe_id = private_endpoint.get('id', '')
-            if pe_id:
-                # Get private endpoint details to extract subnet
-                pe_details = self._get_private_endpoint_details(pe_id)
-                if pe_details:
-                    subnet = pe_details.get('subnet', {})
-                    subnet_id = subnet.get('id')
-                    if subnet_id:
-                        subnet_ids.add(subnet_id)
+        pe_ids = [pe_conn.get('private_endpoint', {}).get('id', '') for pe_conn in pe_connections]
+        pe_ids = [pe_id for pe_id in pe_ids if pe_id]
+        
+        # Get private endpoint details to extract subnet
+        self._bulk_fetch(pe_ids)
+        lookup = executor.map if executor else map
+        for pe_details in lookup(self._get_private_endpoint_details, pe_ids):
+            if pe_details:
+                subnet = pe_details.get('subnet', {})
+                subnet_id = subnet.get('id')
+                if subnet_id:
+                    subnet_ids[subnet_id] = None
         
         return list(subnet_ids)
     
+    @_memoized
     def _get_private_endpoint_details(self, pe_id: str) -> Optional[Dict]:
         """Get private endpoint details"""
         try:
             # Extract resource group and name from the ID
             parts = pe_id.split('/')
             if len(parts) >= 9:
+                pe_data = self._arm_resource(pe_id)
+                if pe_data is not None:
+                    return pe_data
+                
                 pe_rg = parts[4]
                 pe_name = parts[8]
                 
@@ -91,15 +176,14 @@ class VNetAnalyzer:
                 if self.subscription_id:
                     cmd.extend(['--subscription', self.subscription_id])
                     
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    return json.loads(result.stdout)
+                return run_az_json(cmd)
                     
         except Exception as e:
             self.logger.debug(f"Failed to get private endpoint details: {str(e)}")
         
         return None
     
+    @_memoized
     def _get_subnet_info(self, subnet_id: str) -> Optional[Dict]:
         """Get subnet information"""
         try:
@@ -110,18 +194,20 @@ class VNetAnalyzer:
                 vnet_name = parts[8]
                 subnet_name = parts[10]
                 
-                cmd = ['az', 'network', 'vnet', 'subnet', 'show',
-                       '--resource-group', subnet_rg,
-                       '--vnet-name', vnet_name,
-                       '--name', subnet_name,
-                       '--output', 'json']
-                
-                if self.subscription_id:
-                    cmd.extend(['--subscription', self.subscription_id])
+                subnet_data = self._arm_resource(subnet_id)
+                if subnet_data is None:
+                    cmd = ['az', 'network', 'vnet', 'subnet', 'show',
+                           '--resource-group', subnet_rg,
+                           '--vnet-name', vnet_name,
+                           '--name', subnet_name,
+                           '--output', 'json']
                     
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    subnet_data = json.loads(result.stdout)
+                    if self.subscription_id:
+                        cmd.extend(['--subscription', self.subscription_id])
+                        
+                    subnet_data = run_az_json(cmd)
+                
+                if subnet_data is not None:
                     return {
                         'id': subnet_data.get('id'),
                         'name': subnet_data.get('name'),
@@ -140,6 +226,7 @@ class VNetAnalyzer:
         
         return None
     
+    @_memoized
     def _get_vnet_details(self, subnet_id: str) -> Optional[Dict]:
         """Get VNet details from subnet ID"""
         try:
@@ -149,17 +236,19 @@ class VNetAnalyzer:
                 vnet_rg = parts[4]
                 vnet_name = parts[8]
                 
-                cmd = ['az', 'network', 'vnet', 'show',
-                       '--resource-group', vnet_rg,
-                       '--name', vnet_name,
-                       '--output', 'json']
-                
-                if self.subscription_id:
-                    cmd.extend(['--subscription', self.subscription_id])
+                vnet_data = self._arm_resource('/'.join(parts[:9]))
+                if vnet_data is None:
+                    cmd = ['az', 'network', 'vnet', 'show',
+                           '--resource-group', vnet_rg,
+                           '--name', vnet_name,
+                           '--output', 'json']
                     
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    vnet_data = json.loads(result.stdout)
+                    if self.subscription_id:
+                        cmd.extend(['--subscription', self.subscription_id])
+                        
+                    vnet_data = run_az_json(cmd)
+                
+                if vnet_data is not None:
                     return {
                         'id': vnet_data.get('id'),
                         'name': vnet_data.get('name'),
@@ -177,29 +266,7 @@ class VNetAnalyzer:
         
         return None
     
-    def analyze_network_security_groups(self, subnet_ids: List[str]) -> List[Dict]:
-        """Analyze NSGs associated with subnets"""
-        nsgs = []
-        processed_nsgs = set()
-        
-        for subnet_id in subnet_ids:
-            try:
-                subnet_info = self._get_subnet_info(subnet_id)
-                if subnet_info and subnet_info.get('network_security_group'):
-                    nsg_id = subnet_info['network_security_group']['id']
-                    
-                    # Avoid processing the same NSG multiple times
-                    if nsg_id not in processed_nsgs:
-                        processed_nsgs.add(nsg_id)
-                        nsg_details = self._get_nsg_details(nsg_id)
-                        if nsg_details:
-                            nsgs.append(nsg_details)
-                            
-            except Exception as e:
-                self.logger.debug(f"Failed to analyze NSG for subnet {subnet_id}: {str(e)}")
-                
-        return nsgs
-    
+    @_memoized
     def _get_nsg_details(self, nsg_id: str) -> Optional[Dict]:
         """Get NSG rules and configuration"""
         try:
@@ -208,18 +275,19 @@ class VNetAnalyzer:
                 nsg_rg = parts[4]
                 nsg_name = parts[8]
                 
-                cmd = ['az', 'network', 'nsg', 'show',
-                       '--resource-group', nsg_rg,
-                       '--name', nsg_name,
-                       '--output', 'json']
-                
-                if self.subscription_id:
-                    cmd.extend(['--subscription', self.subscription_id])
-                    
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    nsg_data = json.loads(result.stdout)
+                nsg_data = self._arm_resource(nsg_id)
+                if nsg_data is None:
+                    cmd = ['az', 'network', 'nsg', 'show',
+                           '--resource-group', nsg_rg,
+                           '--name', nsg_name,
+                           '--output', 'json']
                     
+                    if self.subscription_id:
+                        cmd.extend(['--subscription', self.subscription_id])
+                        
+                    nsg_data = run_az_json(cmd)
+                
+                if nsg_data is not None:
                     # Extract and analyze relevant rules
                     return {
                         'id': nsg_data.get('id'),
@@ -297,29 +365,7 @@ class VNetAnalyzer:
         
         return analysis
     
-    def _analyze_route_tables(self, subnet_ids: List[str]) -> List[Dict]:
-        """Analyze route tables associated with subnets"""
-        route_tables = []
-        processed_rts = set()
-        
-        for subnet_id in subnet_ids:
-            try:
-                subnet_info = self._get_subnet_info(subnet_id)
-                if subnet_info and subnet_info.get('route_table'):
-                    rt_id = subnet_info['route_table']['id']
-                    
-                    # Avoid processing the same route table multiple times
-                    if rt_id not in processed_rts:
-                        processed_rts.add(rt_id)
-                        rt_details = self._get_route_table_details(rt_id)
-                        if rt_details:
-                            route_tables.append(rt_details)
-                            
-            except Exception as e:
-                self.logger.debug(f"Failed to analyze route table for subnet {subnet_id}: {str(e)}")
-                
-        return route_tables
-    
+    @_memoized
     def _get_route_table_details(self, rt_id: str) -> Optional[Dict]:
         """Get route table details"""
         try:
@@ -328,18 +374,19 @@ class VNetAnalyzer:
                 rt_rg = parts[4]
                 rt_name = parts[8]
                 
-                cmd = ['az', 'network', 'route-table', 'show',
-                       '--resource-group', rt_rg,
-                       '--name', rt_name,
-                       '--output', 'json']
-                
-                if self.subscription_id:
-                    cmd.extend(['--subscription', self.subscription_id])
-                    
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0:
-                    rt_data = json.loads(result.stdout)
+                rt_data = self._arm_resource(rt_id)
+                if rt_data is None:
+                    cmd = ['az', 'network', 'route-table', 'show',
+                           '--resource-group', rt_rg,
+                           '--name', rt_name,
+                           '--output', 'json']
                     
+                    if self.subscription_id:
+                        cmd.extend(['--subscription', self.subscription_id])
+                        
+                    rt_data = run_az_json(cmd)
+                
+                if rt_data is not None:
                     return {
                         'id': rt_data.get('id'),
                         'name': rt_data.get('name'),
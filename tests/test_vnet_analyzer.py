@@ -0,0 +1,132 @@
+import unittest
+from unittest import mock
+
+from src.connectivity.vnet_analyzer import VNetAnalyzer
+
+_RG = '/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Network'
+_NSG_ID = f'{_RG}/networkSecurityGroups/nsg1'
+_RT_ID = f'{_RG}/routeTables/rt1'
+_VNET_ID = f'{_RG}/virtualNetworks/vnet1'
+_SUBNET_ID = f'{_VNET_ID}/subnets/default'
+
+# ARM GET responses keep each rule's and route's fields under their own 'properties'
+_ARM_RESOURCES = {
+    _NSG_ID: {
+        'id': _NSG_ID,
+        'name': 'nsg1',
+        'location': 'eastus',
+        'properties': {
+            'securityRules': [{
+                'id': f'{_NSG_ID}/securityRules/allow-ssh',
+                'name': 'allow-ssh',
+                'properties': {
+                    'priority': 200, 'direction': 'Inbound', 'access': 'Allow', 'protocol': 'Tcp',
+                    'sourceAddressPrefix': 'Internet', 'sourcePortRange': '*',
+                    'destinationAddressPrefix': '*', 'destinationPortRange': '22'
+                }
+            }],
+            'defaultSecurityRules': [
+                {'name': 'DenyAllInBound', 'properties': {'priority': 65500, 'direction': 'Inbound', 'access': 'Deny'}},
+                {'name': 'AllowVnetInBound', 'properties': {'priority': 65000, 'direction': 'Inbound', 'access': 'Allow'}}
+            ]
+        }
+    },
+    _RT_ID: {
+        'id': _RT_ID,
+        'name': 'rt1',
+        'location': 'eastus',
+        'properties': {
+            'disableBgpRoutePropagation': True,
+            'routes': [{
+                'name': 'default',
+                'properties': {
+                    'addressPrefix': '0.0.0.0/0', 'nextHopType': 'VirtualAppliance',
+                    'nextHopIpAddress': '10.0.0.4', 'provisioningState': 'Succeeded'
+                }
+            }]
+        }
+    }
+}
+
+def _fake_arm_get(path, subscription_id, api_version):
+    return _ARM_RESOURCES.get(f'/subscriptions/{subscription_id}/{path}')
+
+@mock.patch('src.connectivity.vnet_analyzer.arm_get', _fake_arm_get)
+class ArmShapedResourceTests(unittest.TestCase):
+    """NSGs and route tables read over ARM are analyzed like az show output"""
+    
+    def setUp(self):
+        self.analyzer = VNetAnalyzer('rg1', 'sub1')
+    
+    def test_nsg_rules_are_flattened(self):
+        nsg = self.analyzer._get_nsg_details(_NSG_ID)
+        
+        self.assertIsNotNone(nsg)
+        self.assertEqual([r['priority'] for r in nsg['default_security_rules']], [65000, 65500])
+        self.assertEqual(nsg['security_rules'][0]['source'], 'Internet:*')
+        self.assertEqual(nsg['rules_summary']['inbound_rules'], 1)
+        self.assertEqual(nsg['rules_summary']['high_risk_rules'],
+                         [{'name': 'allow-ssh', 'risk': 'Open to Internet', 'port': '22'}])
+    
+    def test_routes_are_flattened(self):
+        route_table = self.analyzer._get_route_table_details(_RT_ID)
+        
+        self.assertIsNotNone(route_table)
+        self.assertTrue(route_table['disable_bgp_route_propagation'])
+        self.assertEqual(route_table['routes'], [{
+            'name': 'default',
+            'address_prefix': '0.0.0.0/0',
+            'next_hop_type': 'VirtualAppliance',
+            'next_hop_ip_address': '10.0.0.4',
+            'provisioning_state': 'Succeeded'
+        }])
+
+# Resource Graph rows have the same nesting; subnets only appear inside their VNet
+_GRAPH_ROWS = {
+    _NSG_ID.lower(): _ARM_RESOURCES[_NSG_ID],
+    _VNET_ID.lower(): {
+        'id': _VNET_ID,
+        'name': 'vnet1',
+        'location': 'eastus',
+        'properties': {
+            'addressSpace': {'addressPrefixes': ['10.0.0.0/16']},
+            'subnets': [{
+                'id': _SUBNET_ID,
+                'name': 'default',
+                'properties': {
+                    'addressPrefix': '10.0.0.0/24',
+                    'networkSecurityGroup': {'id': _NSG_ID},
+                    'privateEndpointNetworkPolicies': 'Disabled'
+                }
+            }]
+        }
+    }
+}
+
+@mock.patch('src.connectivity.vnet_analyzer.arm_get', lambda *args: None)
+@mock.patch('src.connectivity.vnet_analyzer.graph_rows', lambda resource_ids, subscription_id: _GRAPH_ROWS)
+class GraphRowTests(unittest.TestCase):
+    """Resources prefetched through Resource Graph are analyzed like az show output"""
+    
+    def setUp(self):
+        self.analyzer = VNetAnalyzer('rg1', 'sub1')
+    
+    def test_subnet_comes_from_vnet_row(self):
+        self.analyzer._bulk_fetch([_VNET_ID])
+        subnet = self.analyzer._get_subnet_info(_SUBNET_ID)
+        
+        self.assertIsNotNone(subnet)
+        self.assertEqual(subnet['address_prefix'], '10.0.0.0/24')
+        self.assertEqual(subnet['network_security_group'], {'id': _NSG_ID})
+        self.assertEqual(subnet['private_endpoint_network_policies'], 'Disabled')
+    
+    def test_nsg_rules_are_flattened(self):
+        self.analyzer._bulk_fetch([_NSG_ID])
+        nsg = self.analyzer._get_nsg_details(_NSG_ID)
+        
+        self.assertIsNotNone(nsg)
+        self.assertEqual(len(nsg['rules_summary']['high_risk_rules']), 1)
+        self.assertEqual(len(nsg['default_security_rules']), 2)
+
+if __name__ == '__main__':
+    unittest.main()